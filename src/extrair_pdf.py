@@ -1,869 +1,1773 @@
-'''
-  Autor: Luiz Anísio
-  Data: 2025-01-18
-  Repositório: https://github.com/luizanisio/extrator_pdf
-
-  Recebe como parâmetro o nome de um arquivo PDF e extrai o texto em formato Markdown 
-  utilizando https://www.docling.ai/ 
-  
-  Se o parâmetro for um yaml, ele processa todos os arquivos PDFs encontrados na pasta_origem.
-  Se o arquivo YAML não existir, oferece criar um arquivo modelo.
-  
-  Parâmetros do yaml:
-  - pasta_origem: o nome da pasta de origem (obrigatório)
-  - pasta_destino: o nome da pasta de destino (se vazia, usa a de origem)
-  - subpastas: True/False (se True, processa as subpastas) - padrão True
-  - sobrescrever: True/False (se True, sobrescreve os arquivos texto existentes) - padrão False
-  - ignorar_dependencias: True/False (se True, ignora erros de dependências opcionais) - padrão True
-
-  A extração ocorre em formato Markdown preservando a formatação original (tabelas, listas, etc).
-  Tags especiais são adicionadas: <PAGINA:nnn> no início de cada página e <IMAGEM:nnn> para imagens.
-  
-  O nome do arquivo de saída é o mesmo do arquivo de entrada, mas com a extensão .md.
-  Um log de extração é gerado no arquivo log_extração.txt. 
-  Um log individual de cada arquivo é gerado no arquivo com o mesmo nome do arquivo de entrada, mas com a extensão .log.
-'''
-
-import os
-import sys
-import regex as re
-import yaml
-from datetime import datetime
-from pathlib import Path
-
-# Verifica dependências obrigatórias
-try:
-    from docling.document_converter import DocumentConverter
-    from docling.datamodel.base_models import InputFormat
-    from docling.datamodel.pipeline_options import PdfPipelineOptions
-    from docling.document_converter import PdfFormatOption
-    DOCLING_DISPONIVEL = True
-except ImportError:
-    DOCLING_DISPONIVEL = False
-
-# Verifica dependências opcionais (OCR e detecção de tabelas)
-DEPENDENCIAS_OPCIONAIS = {
-    'libgl': False,
-    'tesseract': False
-}
-
-def verificar_dependencias_opcionais():
-    """Verifica se as dependências opcionais estão disponíveis e retorna suas versões."""
-    global DEPENDENCIAS_OPCIONAIS
-    
-    # Verifica libGL (necessário para OpenCV/detecção de tabelas)
-    try:
-        import cv2
-        DEPENDENCIAS_OPCIONAIS['libgl'] = f"Instalado (v{cv2.__version__})"
-    except ImportError:
-        DEPENDENCIAS_OPCIONAIS['libgl'] = False
-    except Exception:
-        DEPENDENCIAS_OPCIONAIS['libgl'] = False
-    
-    # Verifica tesseract (necessário para OCR)
-    try:
-        import subprocess
-        result = subprocess.run(['tesseract', '--version'], capture_output=True, text=True, timeout=5)
-        if result.returncode == 0:
-            # Pega a primeira linha da saída (ex: tesseract 5.3.0)
-            versao = result.stdout.splitlines()[0]
-            DEPENDENCIAS_OPCIONAIS['tesseract'] = versao
-        else:
-            DEPENDENCIAS_OPCIONAIS['tesseract'] = False
-    except:
-        DEPENDENCIAS_OPCIONAIS['tesseract'] = False
-    
-    return DEPENDENCIAS_OPCIONAIS
-
-
-def criar_dicas_ambiente(pasta_destino: str = None, deps: dict = None):
-    """
-    Cria arquivo dicas_ambiente.md com status das dependências e instruções se necessário.
-    
-    Args:
-        pasta_destino: Pasta onde criar o arquivo (padrão: diretório atual)
-        deps: Dicionário de dependências (se None, verifica automaticamente)
-    """
-    if deps is None:
-        deps = verificar_dependencias_opcionais()
-    
-    # Define o caminho do arquivo
-    if pasta_destino:
-        arquivo = Path(pasta_destino) / 'dicas_ambiente.md'
-    else:
-        arquivo = Path('dicas_ambiente.md')
-    
-    # Monta o conteúdo
-    linhas = [
-        "# Rastreabilidade e Dicas de Ambiente",
-        "",
-        f"Data de verificação: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-        "",
-        "## Status das Dependências",
-        ""
-    ]
-    
-    # Adiciona status das dependências
-    libgl_status = deps.get('libgl', False)
-    if libgl_status:
-        linhas.append(f"- **OpenCV/libGL**: ✅ {libgl_status}")
-    else:
-        linhas.append("- **OpenCV/libGL**: ❌ Não encontrado")
-
-    tesseract_status = deps.get('tesseract', False)
-    if tesseract_status:
-        linhas.append(f"- **Tesseract OCR**: ✅ {tesseract_status}")
-    else:
-        linhas.append("- **Tesseract OCR**: ❌ Não encontrado")
-    
-    linhas.append("")
-
-    # Se falta alguma dependência, adiciona instruções
-    if not libgl_status or not tesseract_status:
-        linhas.extend([
-            "## Instruções de Instalação",
-            "",
-            "Recursos avançados dependem dos pacotes abaixo:",
-            ""
-        ])
-    
-        if not libgl_status:
-            linhas.append("### OpenCV/libGL (detecção de tabelas)")
-            linhas.append("```bash")
-            linhas.append("sudo apt-get install -y libgl1-mesa-glx libglib2.0-0")
-            linhas.append("```")
-            linhas.append("")
-        
-        if not tesseract_status:
-            linhas.append("### Tesseract OCR (PDFs escaneados)")
-            linhas.append("```bash")
-            linhas.append("sudo apt-get install -y tesseract-ocr tesseract-ocr-por")
-            linhas.append("```")
-            linhas.append("")
-    
-    linhas.extend([
-        "---",
-        "",
-        "📖 Consulte o **README.md** para mais informações.",
-        ""
-    ])
-    
-    # Salva o arquivo
-    arquivo.parent.mkdir(parents=True, exist_ok=True)
-    with open(arquivo, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(linhas))
-    
-    return str(arquivo)
-
-RE_LIMPEZA_REPETICAO = re.compile(r'([.,;+\-_?!:;()\[\]{}|@#$%^&*=~`\'])\1+')
-def limpar_texto(texto: str) -> str:
-    """Limpa o texto removendo caracteres especiais excessivos e normalizando espaços."""
-    # Substitui múltiplos espaços horizontais por um único
-    texto = re.sub(r'[ \t]+', ' ', texto)
-    # Normaliza quebras de linha (no máximo 2 consecutivas)
-    texto = re.sub(r'\n{3,}', '\n\n', texto)
-    # Substitui múltiplos caracters especiais pelo mesmo caractere uma vez
-    texto = RE_LIMPEZA_REPETICAO.sub(r'\1', texto)
-    return texto.strip()
-
-class ExtrairPdf:
-    """Classe responsável por extrair texto de um único arquivo PDF em formato Markdown."""
-    
-    def __init__(self, arquivo_pdf: str, pasta_destino: str = None, 
-                 pasta_log: str = None, ignorar_dependencias: bool = True,
-                 ocr: bool = True, detectar_tabelas: bool = True, 
-                 gerar_dicas: bool = True):
-        """
-        Inicializa o extrator de PDF.
-        
-        Args:
-            arquivo_pdf: Caminho do arquivo PDF
-            pasta_destino: Pasta de destino para os arquivos gerados
-            pasta_log: Pasta para os logs (se vazia, usa pasta_destino)
-            ignorar_dependencias: Se True, ignora erros de dependências opcionais genéricas
-            ocr: Se True, usa OCR (requer Tesseract). Se False, não usa OCR.
-            detectar_tabelas: Se True, detecta estrutura de tabelas (requer libGL/OpenCV).
-            gerar_dicas: Se True, gera arquivo de dicas de ambiente
-        """
-        self.arquivo_pdf = Path(arquivo_pdf).resolve()
-        self.ignorar_dependencias = ignorar_dependencias
-        self.ocr = ocr
-        self.detectar_tabelas = detectar_tabelas
-        self.gerar_dicas = gerar_dicas
-        
-        # Define pasta de destino
-        if pasta_destino:
-            self.pasta_destino = Path(pasta_destino).resolve()
-        else:
-            self.pasta_destino = self.arquivo_pdf.parent
-        
-        # Define pasta de log (se não especificada, usa pasta_destino)
-        if pasta_log:
-            self.pasta_log = Path(pasta_log).resolve()
-        else:
-            self.pasta_log = self.pasta_destino
-        
-        # Cria pastas se não existirem
-        self.pasta_destino.mkdir(parents=True, exist_ok=True)
-        self.pasta_log.mkdir(parents=True, exist_ok=True)
-        
-        # Define arquivos de saída (agora .md para markdown)
-        nome_base = self.arquivo_pdf.stem
-        self.arquivo_md = self.pasta_destino / f"{nome_base}.md"
-        self.arquivo_log = self.pasta_log / f"{nome_base}.log"
-        self.log = []
-        
-        # Contador de imagens
-        self.contador_imagens = 0
-        
-    def _adicionar_log(self, mensagem: str):
-        """Adiciona uma mensagem ao log."""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        entrada_log = f"[{timestamp}] {mensagem}"
-        self.log.append(entrada_log)
-        print(entrada_log)
-        
-    def _salvar_log(self):
-        """Salva o log individual do arquivo."""
-        with open(self.arquivo_log, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(self.log))
-    
-    def _verificar_dependencias(self) -> bool:
-        """
-        Verifica se as dependências estão disponíveis.
-        Retorna False se dependências críticas estiverem faltando.
-        """
-        if not DOCLING_DISPONIVEL:
-            self._adicionar_log("ERRO CRÍTICO: O pacote 'docling' não está instalado.")
-            self._adicionar_log("Instale com: pip install docling")
-            return False
-        
-        deps = verificar_dependencias_opcionais()
-        
-        # Cria arquivo de dicas (rastreabilidade do ambiente)
-        if self.gerar_dicas:
-            arquivo_dicas = criar_dicas_ambiente(str(self.pasta_log), deps)
-            if arquivo_dicas:
-                 self._adicionar_log(f"Informações do ambiente salvas em: {arquivo_dicas}")
-
-        # Lógica de Tabelas (libGL)
-        if self.detectar_tabelas:
-            if not deps['libgl']:
-                self._adicionar_log("ERRO: Detecção de tabelas habilitada (detectar_tabelas: true) mas libGL/OpenCV não encontrado.")
-                self._adicionar_log("Solução 1: Instale dependências gráficas (veja dicas_ambiente.md)")
-                self._adicionar_log("Solução 2: Desabilite Tabelas no config (detectar_tabelas: false)")
-                return False
-        else:
-            if not deps['libgl']:
-                 self._adicionar_log("AVISO: libGL/OpenCV não encontrado, mas Tabelas está desabilitado.")
-
-        # Lógica do OCR
-        if self.ocr:
-            if not deps['tesseract']:
-                self._adicionar_log("ERRO: OCR habilitado (ocr: true) mas Tesseract não encontrado.")
-                self._adicionar_log("Solução 1: Instale o Tesseract (veja dicas_ambiente.md)")
-                self._adicionar_log("Solução 2: Desabilite o OCR no config (ocr: false)")
-                return False
-        else:
-            if not deps['tesseract']:
-                 self._adicionar_log("AVISO: Tesseract não encontrado, mas OCR está desabilitado.")
-        
-        return True
-    
-    def _substituir_imagens_markdown(self, texto_md: str) -> str:
-        """Substitui referências de imagens no markdown por tags <IMAGEM:nnn>."""
-        # Padrões de imagem em markdown
-        padroes = [
-            r'!\[([^\]]*)\]\([^\)]+\)',  # ![alt](url)
-            r'<img[^>]*>',               # <img ... >
-            r'\[image[^\]]*\]',          # [image...]
-            r'\[figure[^\]]*\]',         # [figure...]
-            r'\[figura[^\]]*\]',         # [figura...]
-            r'\[imagem[^\]]*\]',         # [imagem...]
-        ]
-        
-        def substituir(match):
-            self.contador_imagens += 1
-            return f"<IMAGEM:{self.contador_imagens:03d}>"
-        
-        texto_processado = texto_md
-        for padrao in padroes:
-            texto_processado = re.sub(padrao, substituir, texto_processado, flags=re.IGNORECASE)
-        
-        return texto_processado
-    
-    def extrair(self) -> bool:
-        """
-        Extrai o texto do PDF em formato Markdown usando Docling.
-        Retorna True se bem-sucedido, False caso contrário.
-        """
-        self._adicionar_log(f"Iniciando extração: {self.arquivo_pdf}")
-        
-        # Verifica se o arquivo existe
-        if not self.arquivo_pdf.exists():
-            self._adicionar_log(f"ERRO: Arquivo não encontrado: {self.arquivo_pdf}")
-            self._salvar_log()
-            return False
-        
-        # Verifica dependências
-        if not self._verificar_dependencias():
-            self._salvar_log()
-            return False
-        
-        try:
-            # Configura o conversor
-            self._adicionar_log("Inicializando DocumentConverter...")
-            
-            # Verifica quais features podem ser habilitadas
-            deps = verificar_dependencias_opcionais()
-            
-            pipeline_options = PdfPipelineOptions()
-            pipeline_options.do_ocr = self.ocr and bool(deps['tesseract'])
-            pipeline_options.do_table_structure = self.detectar_tabelas and bool(deps['libgl'])
-            
-            if pipeline_options.do_ocr:
-                self._adicionar_log("OCR habilitado")
-            else:
-                self._adicionar_log("OCR desabilitado")
-                
-            if pipeline_options.do_table_structure:
-                self._adicionar_log("Detecção de tabelas habilitada")
-            else:
-                self._adicionar_log("Detecção de tabelas desabilitada")
-            
-            converter = DocumentConverter(
-                format_options={
-                    InputFormat.PDF: PdfFormatOption(
-                        pipeline_options=pipeline_options
-                    )
-                }
-            )
-            
-            # Converte o documento
-            self._adicionar_log("Convertendo documento...")
-            resultado = converter.convert(str(self.arquivo_pdf))
-            
-            # Extrai o documento
-            documento = resultado.document
-            
-            # Processa página por página para adicionar tags
-            self._adicionar_log("Processando páginas...")
-            
-            # Agrupa conteúdo por página
-            paginas_conteudo = {}
-            
-            for item, nivel in documento.iterate_items():
-                # Obtém o número da página
-                num_pagina = 1
-                if hasattr(item, 'prov') and item.prov:
-                    for prov in item.prov:
-                        if hasattr(prov, 'page_no'):
-                            num_pagina = prov.page_no
-                            break
-                
-                # Detecta tipo do item
-                tipo_item = type(item).__name__.lower()
-                
-                # Obtém conteúdo em markdown
-                conteudo = ""
-                if 'picture' in tipo_item or 'image' in tipo_item or 'figure' in tipo_item:
-                    self.contador_imagens += 1
-                    conteudo = f"<IMAGEM:{self.contador_imagens:03d}>"
-                elif hasattr(item, 'export_to_markdown'):
-                    try:
-                        conteudo = item.export_to_markdown(documento)
-                    except TypeError:
-                        try:
-                            conteudo = item.export_to_markdown()
-                        except:
-                            if hasattr(item, 'text') and item.text:
-                                conteudo = item.text
-                elif hasattr(item, 'text') and item.text:
-                    conteudo = item.text
-                
-                if conteudo:
-                    if num_pagina not in paginas_conteudo:
-                        paginas_conteudo[num_pagina] = []
-                    paginas_conteudo[num_pagina].append(conteudo)
-            
-            # Monta o markdown final com tags de página
-            markdown_final = ""
-            
-            if paginas_conteudo:
-                for num_pagina in sorted(paginas_conteudo.keys()):
-                    markdown_final += f"\n<PAGINA:{num_pagina:03d}>\n\n"
-                    conteudo_pagina = '\n\n'.join(paginas_conteudo[num_pagina])
-                    # Processa referências de imagens que podem ter vindo no markdown
-                    conteudo_pagina = self._substituir_imagens_markdown(conteudo_pagina)
-                    markdown_final += conteudo_pagina
-                    markdown_final += '\n'
-            else:
-                # Fallback: usa o markdown completo do documento
-                self._adicionar_log("Aviso: Não foi possível separar por páginas, usando markdown completo")
-                markdown_final = f"<PAGINA:001>\n\n{documento.export_to_markdown()}"
-                markdown_final = self._substituir_imagens_markdown(markdown_final)
-            
-            # Limpeza final do texto
-            self._adicionar_log("Aplicando limpeza de texto (ruídos)...")
-            markdown_final = limpar_texto(markdown_final)
-            
-            # Salva o arquivo markdown
-            self._adicionar_log(f"Salvando markdown em: {self.arquivo_md}")
-            with open(self.arquivo_md, 'w', encoding='utf-8') as f:
-                f.write(markdown_final.strip())
-            
-            # Estatísticas
-            num_caracteres = len(markdown_final)
-            num_palavras = len(markdown_final.split())
-            num_paginas = len(paginas_conteudo) if paginas_conteudo else 1
-            
-            self._adicionar_log(f"Extração concluída com sucesso!")
-            self._adicionar_log(f"  - Páginas: {num_paginas}")
-            self._adicionar_log(f"  - Imagens detectadas: {self.contador_imagens}")
-            self._adicionar_log(f"  - Caracteres: {num_caracteres}")
-            self._adicionar_log(f"  - Palavras: ~{num_palavras}")
-            
-            self._salvar_log()
-            return True
-            
-        except Exception as e:
-            self._adicionar_log(f"ERRO durante extração: {str(e)}")
-            import traceback
-            self._adicionar_log(f"Traceback: {traceback.format_exc()}")
-            self._salvar_log()
-            return False
-
-
-class ListarArquivosPdf:
-    """Classe utilitária para listar arquivos PDF em uma pasta."""
-    
-    @classmethod
-    def listar(cls, pasta_origem: str, subpastas: bool = True) -> list:
-        """
-        Lista todos os arquivos PDF em uma pasta.
-        
-        Args:
-            pasta_origem: Caminho da pasta de origem
-            subpastas: Se True, busca recursivamente em subpastas
-            
-        Returns:
-            Lista de caminhos completos dos arquivos PDF encontrados
-        """
-        pasta = Path(pasta_origem).resolve()
-        
-        if not pasta.exists():
-            print(f"ERRO: Pasta não encontrada: {pasta}")
-            return []
-        
-        if not pasta.is_dir():
-            print(f"ERRO: Não é uma pasta: {pasta}")
-            return []
-        
-        # Busca arquivos PDF
-        if subpastas:
-            arquivos = list(pasta.rglob("*.pdf")) + list(pasta.rglob("*.PDF"))
-        else:
-            arquivos = list(pasta.glob("*.pdf")) + list(pasta.glob("*.PDF"))
-        
-        # Remove duplicatas (diferença de case em Windows)
-        arquivos_unicos = []
-        caminhos_vistos = set()
-        for arq in arquivos:
-            caminho_normalizado = str(arq).lower()
-            if caminho_normalizado not in caminhos_vistos:
-                caminhos_vistos.add(caminho_normalizado)
-                arquivos_unicos.append(arq)
-        
-        return sorted(arquivos_unicos)
-
-
-class ProcessarPasta:
-    """Classe para processar múltiplos PDFs de uma pasta baseado em configuração YAML."""
-    
-    def __init__(self, config_ou_yaml: str = None, pasta_origem: str = None, 
-                 pasta_destino: str = None, pasta_log: str = None,
-                 subpastas: bool = True, sobrescrever: bool = False, 
-                 ignorar_dependencias: bool = True, ocr: bool = True,
-                 detectar_tabelas: bool = True):
-        """
-        Inicializa o processador de pasta.
-        
-        Args:
-            config_ou_yaml: Caminho para arquivo YAML de configuração (opcional)
-            pasta_origem: Pasta de origem (se não usar YAML)
-            pasta_destino: Pasta de destino (se não usar YAML)
-            pasta_log: Pasta para logs (se não usar YAML, padrão pasta_destino)
-            subpastas: Processar subpastas (padrão True)
-            sobrescrever: Sobrescrever arquivos existentes (padrão False)
-            ignorar_dependencias: Ignorar erros de dependências opcionais (padrão True)
-            ocr: Habilitar OCR (padrão True)
-            detectar_tabelas: Habilitar detecção de tabelas (padrão True)
-        """
-        self.ignorar_dependencias = ignorar_dependencias
-        self.ocr = ocr
-        self.detectar_tabelas = detectar_tabelas
-        self.pasta_log = None
-        
-        # Se recebeu um arquivo YAML, carrega as configurações
-        if config_ou_yaml and config_ou_yaml.lower().endswith('.yaml'):
-            self._carregar_yaml(config_ou_yaml)
-        else:
-            self.pasta_origem = Path(pasta_origem).resolve() if pasta_origem else None
-            self.pasta_destino = Path(pasta_destino).resolve() if pasta_destino else self.pasta_origem
-            self.pasta_log = Path(pasta_log).resolve() if pasta_log else None
-            self.subpastas = subpastas
-            self.sobrescrever = sobrescrever
-        
-        # Define pasta de log (se não especificada, usa pasta_destino)
-        if not self.pasta_log:
-            self.pasta_log = self.pasta_destino
-        
-        # Cria pasta de log se não existir
-        if self.pasta_log:
-            self.pasta_log.mkdir(parents=True, exist_ok=True)
-        
-        # Log geral
-        if self.pasta_log:
-            self.arquivo_log = self.pasta_log / 'log_extração.txt'
-        elif self.pasta_origem:
-            self.arquivo_log = self.pasta_origem / 'log_extração.txt'
-        else:
-            self.arquivo_log = Path('log_extração.txt')
-        self.log = []
-        
-        # Estatísticas
-        self.total_processados = 0
-        self.total_sucesso = 0
-        self.total_falha = 0
-        self.total_ignorados = 0
-    
-    def _carregar_yaml(self, caminho_yaml: str):
-        """Carrega configurações de um arquivo YAML."""
-        with open(caminho_yaml, 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f)
-        
-        self.pasta_origem = Path(config.get('pasta_origem', '.')).resolve()
-        
-        pasta_dest = config.get('pasta_destino', '')
-        if pasta_dest:
-            self.pasta_destino = Path(pasta_dest).resolve()
-        else:
-            self.pasta_destino = self.pasta_origem
-        
-        # Pasta de log (se não especificada, usa pasta_destino)
-        pasta_log = config.get('pasta_log', '')
-        if pasta_log:
-            self.pasta_log = Path(pasta_log).resolve()
-        else:
-            self.pasta_log = None  # será definida depois como pasta_destino
-            
-        self.subpastas = config.get('subpastas', True)
-        self.sobrescrever = config.get('sobrescrever', False)
-        self.ignorar_dependencias = config.get('ignorar_dependencias', True)
-        self.ocr = config.get('ocr', True)
-        self.detectar_tabelas = config.get('detectar_tabelas', True)
-        
-    def _adicionar_log(self, mensagem: str):
-        """Adiciona uma mensagem ao log geral."""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        entrada_log = f"[{timestamp}] {mensagem}"
-        self.log.append(entrada_log)
-        print(entrada_log)
-        
-    def _salvar_log(self):
-        """Salva o log geral de extração."""
-        with open(self.arquivo_log, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(self.log))
-            
-    def _calcular_destino(self, arquivo_pdf: Path) -> Path:
-        """
-        Calcula o caminho de destino para um arquivo, preservando a estrutura de subpastas.
-        """
-        # Calcula o caminho relativo em relação à pasta de origem
-        try:
-            caminho_relativo = arquivo_pdf.parent.relative_to(self.pasta_origem)
-            pasta_destino_arquivo = self.pasta_destino / caminho_relativo
-        except ValueError:
-            # Se não conseguir calcular relativo, usa a pasta de destino diretamente
-            pasta_destino_arquivo = self.pasta_destino
-        
-        return pasta_destino_arquivo
-    
-    def processar(self) -> dict:
-        """
-        Processa todos os PDFs da pasta de origem.
-        
-        Returns:
-            Dicionário com estatísticas do processamento
-        """
-        self._adicionar_log("=" * 60)
-        self._adicionar_log("INICIANDO PROCESSAMENTO EM LOTE")
-        self._adicionar_log("=" * 60)
-        self._adicionar_log(f"Pasta de origem: {self.pasta_origem}")
-        self._adicionar_log(f"Pasta de destino: {self.pasta_destino}")
-        self._adicionar_log(f"Incluir subpastas: {self.subpastas}")
-        self._adicionar_log(f"Sobrescrever existentes: {self.sobrescrever}")
-        self._adicionar_log(f"Utilizar OCR: {self.ocr}")
-        self._adicionar_log(f"Detectar Tabelas: {self.detectar_tabelas}")
-        self._adicionar_log(f"Ignorar dependências opcionais: {self.ignorar_dependencias}")
-        self._adicionar_log("-" * 60)
-        
-        # Log das dependências disponíveis
-        deps = verificar_dependencias_opcionais()
-        self._adicionar_log(f"Dependências: libGL={deps['libgl']}, tesseract={deps['tesseract']}")
-        
-        # Cria arquivo de dicas (rastreabilidade do ambiente)
-        arquivo_dicas = criar_dicas_ambiente(str(self.pasta_log), deps)
-        if arquivo_dicas:
-            self._adicionar_log(f"Informações do ambiente salvas em: {arquivo_dicas}")
-
-        # Validação do OCR 
-        if self.ocr and not deps['tesseract']:
-            self._adicionar_log("ERRO: OCR habilitado mas Tesseract não encontrado.")
-            self._adicionar_log("Interrompendo processamento. Instale o Tesseract ou use 'ocr: false'.")
-            self._salvar_log()
-            return self._gerar_estatisticas()
-        
-        # Validação de Tabelas
-        if self.detectar_tabelas and not deps['libgl']:
-            self._adicionar_log("ERRO: Detecção de tabelas habilitada mas libGL/OpenCV não encontrado.")
-            self._adicionar_log("Interrompendo processamento. Instale libGL ou use 'detectar_tabelas: false'.")
-            self._salvar_log()
-            return self._gerar_estatisticas()
-        
-        if not self.ignorar_dependencias and (not deps['libgl'] or not deps['tesseract']):
-            # Fallback legacy ou generic checks
-            pass
-        
-        self._adicionar_log("-" * 60)
-        
-        # Cria pasta de destino se não existir
-        self.pasta_destino.mkdir(parents=True, exist_ok=True)
-        
-        # Lista os arquivos PDF
-        arquivos = ListarArquivosPdf.listar(str(self.pasta_origem), self.subpastas)
-        
-        if not arquivos:
-            self._adicionar_log("Nenhum arquivo PDF encontrado!")
-            self._salvar_log()
-            return self._gerar_estatisticas()
-        
-        self._adicionar_log(f"Arquivos PDF encontrados: {len(arquivos)}")
-        self._adicionar_log("-" * 60)
-        
-        # Processa cada arquivo
-        for i, arquivo_pdf in enumerate(arquivos, 1):
-            self._adicionar_log(f"\n[{i}/{len(arquivos)}] Processando: {arquivo_pdf.name}")
-            
-            # Calcula o destino preservando estrutura de pastas
-            pasta_destino_arquivo = self._calcular_destino(arquivo_pdf)
-            
-            # Cria a pasta de destino se necessário
-            pasta_destino_arquivo.mkdir(parents=True, exist_ok=True)
-            
-            # Verifica se já existe arquivo de saída (agora .md)
-            nome_base = arquivo_pdf.stem
-            arquivo_md = pasta_destino_arquivo / f"{nome_base}.md"
-            
-            if arquivo_md.exists() and not self.sobrescrever:
-                self._adicionar_log(f"  -> IGNORADO: {arquivo_md.name} já existe")
-                self.total_ignorados += 1
-                continue
-            
-            # Extrai o texto
-            try:
-                # Calcula pasta de log mantendo estrutura de subpastas se houver
-                if self.pasta_log != self.pasta_destino:
-                    try:
-                        caminho_relativo = arquivo_pdf.parent.relative_to(self.pasta_origem)
-                        pasta_log_arquivo = self.pasta_log / caminho_relativo
-                    except ValueError:
-                        pasta_log_arquivo = self.pasta_log
-                else:
-                    pasta_log_arquivo = pasta_destino_arquivo
-                
-                extrator = ExtrairPdf(
-                    str(arquivo_pdf), 
-                    str(pasta_destino_arquivo),
-                    pasta_log=str(pasta_log_arquivo),
-                    ignorar_dependencias=self.ignorar_dependencias,
-                    ocr=self.ocr,
-                    detectar_tabelas=self.detectar_tabelas,
-                    gerar_dicas=False  # Já gerado na pasta principal
-                )
-                sucesso = extrator.extrair()
-                
-                self.total_processados += 1
-                if sucesso:
-                    self.total_sucesso += 1
-                    self._adicionar_log(f"  -> SUCESSO: {arquivo_md.name}")
-                else:
-                    self.total_falha += 1
-                    self._adicionar_log(f"  -> FALHA: Verifique {nome_base}.log")
-                    
-            except Exception as e:
-                self.total_processados += 1
-                self.total_falha += 1
-                self._adicionar_log(f"  -> ERRO: {str(e)}")
-        
-        # Resumo final
-        self._adicionar_log("\n" + "=" * 60)
-        self._adicionar_log("RESUMO DO PROCESSAMENTO")
-        self._adicionar_log("=" * 60)
-        self._adicionar_log(f"Total de arquivos encontrados: {len(arquivos)}")
-        self._adicionar_log(f"Processados com sucesso: {self.total_sucesso}")
-        self._adicionar_log(f"Processados com falha: {self.total_falha}")
-        self._adicionar_log(f"Ignorados (já existem): {self.total_ignorados}")
-        self._adicionar_log("=" * 60)
-        
-        self._salvar_log()
-        return self._gerar_estatisticas()
-    
-    def _gerar_estatisticas(self) -> dict:
-        """Gera dicionário com estatísticas do processamento."""
-        return {
-            'processados': self.total_processados,
-            'sucesso': self.total_sucesso,
-            'falha': self.total_falha,
-            'ignorados': self.total_ignorados
-        }
-
-
-def criar_yaml_modelo(caminho: str):
-    """Cria um arquivo YAML modelo no caminho especificado."""
-    conteudo = '''# Configuração para extração em lote de PDFs
-# Execute com: python extrair_pdf.py config_extracao.yaml
-
-# Pasta contendo os arquivos PDF (obrigatório)
-pasta_origem: ./pdfs
-
-# Pasta para salvar os arquivos extraídos (se vazio, usa pasta_origem)
-pasta_destino: ./textos
-
-# Pasta para salvar os logs (se vazio, usa pasta_destino)
-# pasta_log: ./logs
-
-# Processar subpastas recursivamente? (padrão: true)
-subpastas: true
-
-# Sobrescrever arquivos existentes? (padrão: false)
-sobrescrever: false
-
-# Habilitar OCR (Optical Character Recognition)?
-# Se true (padrão): requer Tesseract instalado. Se não tiver, o processamento para.
-# Se false: ignora OCR se Tesseract não estiver disponível
-ocr: true
-
-# Habilitar detecção avançada de tabelas?
-# Se true (padrão): requer libGL/OpenCV instalado (=sudo apt install libgl1).
-# Se false: ignora tabelas se libGL não estiver disponível
-detectar_tabelas: true
-
-# Ignorar erros de dependências opcionais genéricas?
-# (padrão: true)
-ignorar_dependencias: true
-'''
-    
-    with open(caminho, 'w', encoding='utf-8') as f:
-        f.write(conteudo)
-    
-    print(f"✅ Arquivo modelo criado: {caminho}")
-
-
-def mostrar_uso():
-    """Mostra instruções de uso do script."""
-    print("""
-╔══════════════════════════════════════════════════════════════════════════════╗
-║                   EXTRATOR DE PDF PARA MARKDOWN - DOCLING                    ║
-╠══════════════════════════════════════════════════════════════════════════════╣
-║ Uso:                                                                         ║
-║   python extrair_pdf.py <arquivo_pdf>                                        ║
-║   python extrair_pdf.py <arquivo_yaml>                                       ║
-║                                                                              ║
-║ Exemplos:                                                                    ║
-║   python extrair_pdf.py documento.pdf                                        ║
-║   python extrair_pdf.py config_extracao.yaml                                 ║
-║                                                                              ║
-║ Formato do arquivo YAML:                                                     ║
-║   pasta_origem: ./pdfs                                                       ║
-║   pasta_destino: ./textos                                                    ║
-║   pasta_log: ./logs                                                          ║
-║   subpastas: true                                                            ║
-║   sobrescrever: false                                                        ║
-║   ignorar_dependencias: true                                                 ║
-║                                                                              ║
-║ Parâmetros YAML:                                                             ║
-║   - pasta_origem: Pasta contendo os PDFs (obrigatório)                       ║
-║   - pasta_destino: Pasta para salvar os textos (padrão: pasta_origem)        ║
-║   - pasta_log: Pasta para salvar os logs (padrão: pasta_destino)             ║
-║   - subpastas: True/False - processar subpastas (padrão: True)               ║
-║   - sobrescrever: True/False - sobrescrever existentes (padrão: False)       ║
-║   - ocr: True/False - habilitar OCR, requer Tesseract (padrão: True)         ║
-║   - detectar_tabelas: True/False - detectar tabelas (padrão: True)           ║
-║   - ignorar_dependencias: True/False - ignorar deps opcionais (padrão: True) ║
-║                                                                              ║
-║ Saída:                                                                       ║
-║   - Arquivo .md com o texto em Markdown (tags <PAGINA:nnn> e <IMAGEM:nnn>)   ║
-║   - Arquivo .log com detalhes da extração de cada arquivo                    ║
-║   - log_extração.txt com resumo geral (modo pasta)                           ║
-╚══════════════════════════════════════════════════════════════════════════════╝
-""")
-
-
-if __name__ == '__main__':
-    # Verifica se o docling está instalado
-    if not DOCLING_DISPONIVEL:
-        print("❌ ERRO: O pacote 'docling' não está instalado.")
-        print("   Instale com: pip install docling")
-        sys.exit(1)
-    
-    if len(sys.argv) < 2:
-        mostrar_uso()
-        sys.exit(1)
-    
-    arquivo_enviado = sys.argv[1]
-    
-    # Processa arquivo PDF individual
-    if os.path.isfile(arquivo_enviado) and arquivo_enviado.lower().endswith('.pdf'):
-        print(f"\n🔄 Processando PDF: {arquivo_enviado}\n")
-        extrator = ExtrairPdf(arquivo_enviado)
-        sucesso = extrator.extrair()
-        
-        if sucesso:
-            print(f"\n✅ Markdown extraído com sucesso!")
-            print(f"   Arquivo: {extrator.arquivo_md}")
-        else:
-            print(f"\n❌ Falha na extração. Verifique o log: {extrator.arquivo_log}")
-            sys.exit(1)
-    
-    # Processa arquivo YAML com configurações
-    elif arquivo_enviado.lower().endswith('.yaml') or arquivo_enviado.lower().endswith('.yml'):
-        # Verifica se o arquivo existe
-        if not os.path.isfile(arquivo_enviado):
-            print(f"\n⚠️  Arquivo YAML não encontrado: {arquivo_enviado}")
-            resposta = input("   Deseja criar um arquivo modelo? (s/n): ").strip().lower()
-            
-            if resposta in ['s', 'sim', 'y', 'yes']:
-                criar_yaml_modelo(arquivo_enviado)
-                print(f"\n📝 Edite o arquivo '{arquivo_enviado}' e execute novamente.")
-            else:
-                print("   Operação cancelada.")
-            sys.exit(0)
-        
-        print(f"\n🔄 Processando pasta com configuração: {arquivo_enviado}\n")
-        processador = ProcessarPasta(arquivo_enviado)
-        estatisticas = processador.processar()
-        
-        print(f"\n📊 Resultado:")
-        print(f"   Sucesso: {estatisticas['sucesso']}")
-        print(f"   Falhas: {estatisticas['falha']}")
-        print(f"   Ignorados: {estatisticas['ignorados']}")
-        
-        if estatisticas['falha'] > 0:
-            sys.exit(1)
-    
-    else:
-        print(f"\n❌ Arquivo não encontrado ou formato inválido: {arquivo_enviado}")
-        print("   Use arquivos .pdf ou .yaml")
-        mostrar_uso()
+'''
+  Autor: Luiz Anísio
+  Data: 2025-01-18
+  Repositório: https://github.com/luizanisio/extrator_pdf
+
+  Recebe como parâmetro o nome de um arquivo PDF e extrai o texto em formato Markdown 
+  utilizando https://www.docling.ai/ 
+  
+  Se o parâmetro for um yaml, ele processa todos os arquivos PDFs encontrados na pasta_origem.
+  Se o arquivo YAML não existir, oferece criar um arquivo modelo.
+  
+  Parâmetros do yaml:
+  - pasta_origem: o nome da pasta de origem (obrigatório)
+  - pasta_destino: o nome da pasta de destino (se vazia, usa a de origem)
+  - subpastas: True/False (se True, processa as subpastas) - padrão True
+  - sobrescrever: True/False (se True, sobrescreve os arquivos texto existentes) - padrão False
+  - ignorar_dependencias: True/False (se True, ignora erros de dependências opcionais) - padrão True
+
+  A extração ocorre em formato Markdown preservando a formatação original (tabelas, listas, etc).
+  Tags especiais são adicionadas: <PAGINA:nnn> no início de cada página e <IMAGEM:nnn> para imagens.
+  
+  O nome do arquivo de saída é o mesmo do arquivo de entrada, mas com a extensão .md.
+  Um log de extração é gerado no arquivo log_extração.txt. 
+  Um log individual de cada arquivo é gerado no arquivo com o mesmo nome do arquivo de entrada, mas com a extensão .log.
+'''
+
+import functools
+import io
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import threading
+import time
+import types
+import regex as re
+from collections import Counter
+from concurrent.futures import (ProcessPoolExecutor, ThreadPoolExecutor,
+                                as_completed)
+from datetime import datetime
+from pathlib import Path
+
+
+# Verifica a dependência obrigatória sem pagar o custo do import na carga do
+# módulo (o docling puxa torch/transformers — segundos de cold start que só
+# valem a pena quando há extração de fato)
+@functools.lru_cache(maxsize=1)
+def _docling_disponivel() -> bool:
+    try:
+        import docling.document_converter  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+# Verifica dependências opcionais (OCR e detecção de tabelas)
+@functools.lru_cache(maxsize=1)
+def verificar_dependencias_opcionais():
+    """
+    Verifica se as dependências opcionais estão disponíveis e retorna suas versões.
+
+    O resultado é memoizado: a verificação (import do cv2 e subprocess do
+    tesseract) é cara e o ambiente não muda durante a execução, então cada
+    processo paga o custo uma única vez.
+    """
+    dependencias = {
+        'libgl': False,
+        'tesseract': False
+    }
+
+    # Verifica libGL (necessário para OpenCV/detecção de tabelas)
+    try:
+        import cv2
+        dependencias['libgl'] = f"Instalado (v{cv2.__version__})"
+    except ImportError:
+        dependencias['libgl'] = False
+    except Exception:
+        dependencias['libgl'] = False
+
+    # Verifica tesseract (necessário para OCR)
+    # shutil.which só percorre o PATH — evita o fork+exec de 'tesseract --version'
+    caminho_tesseract = shutil.which('tesseract')
+    if caminho_tesseract:
+        dependencias['tesseract'] = f"Instalado ({caminho_tesseract})"
+    else:
+        dependencias['tesseract'] = False
+
+    # Retorna uma visão imutável para evitar que chamadores alterem o cache
+    return types.MappingProxyType(dependencias)
+
+
+# Caminhos de dicas_ambiente.md já gravados neste processo (evita reescrita)
+_dicas_gravadas = set()
+
+
+def criar_dicas_ambiente(pasta_destino: str = None, deps: dict = None):
+    """
+    Cria arquivo dicas_ambiente.md com status das dependências e instruções se necessário.
+
+    O conteúdo só depende do ambiente, então cada caminho é gravado no máximo
+    uma vez por processo — chamadas repetidas retornam sem tocar no disco.
+
+    Args:
+        pasta_destino: Pasta onde criar o arquivo (padrão: diretório atual)
+        deps: Dicionário de dependências (se None, verifica automaticamente)
+    """
+    if deps is None:
+        deps = verificar_dependencias_opcionais()
+
+    # Define o caminho do arquivo
+    if pasta_destino:
+        arquivo = Path(pasta_destino) / 'dicas_ambiente.md'
+    else:
+        arquivo = Path('dicas_ambiente.md')
+
+    # Já gravado neste processo? Não reescreve o mesmo conteúdo
+    caminho_str = str(arquivo.resolve())
+    if caminho_str in _dicas_gravadas:
+        return caminho_str
+
+    # Monta o conteúdo
+    linhas = [
+        "# Rastreabilidade e Dicas de Ambiente",
+        "",
+        f"Data de verificação: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+        "",
+        "## Status das Dependências",
+        ""
+    ]
+    
+    # Adiciona status das dependências
+    libgl_status = deps.get('libgl', False)
+    if libgl_status:
+        linhas.append(f"- **OpenCV/libGL**: ✅ {libgl_status}")
+    else:
+        linhas.append("- **OpenCV/libGL**: ❌ Não encontrado")
+
+    tesseract_status = deps.get('tesseract', False)
+    if tesseract_status:
+        linhas.append(f"- **Tesseract OCR**: ✅ {tesseract_status}")
+    else:
+        linhas.append("- **Tesseract OCR**: ❌ Não encontrado")
+    
+    linhas.append("")
+
+    # Se falta alguma dependência, adiciona instruções
+    if not libgl_status or not tesseract_status:
+        linhas.extend([
+            "## Instruções de Instalação",
+            "",
+            "Recursos avançados dependem dos pacotes abaixo:",
+            ""
+        ])
+    
+        if not libgl_status:
+            linhas.append("### OpenCV/libGL (detecção de tabelas)")
+            linhas.append("```bash")
+            linhas.append("sudo apt-get install -y libgl1-mesa-glx libglib2.0-0")
+            linhas.append("```")
+            linhas.append("")
+        
+        if not tesseract_status:
+            linhas.append("### Tesseract OCR (PDFs escaneados)")
+            linhas.append("```bash")
+            linhas.append("sudo apt-get install -y tesseract-ocr tesseract-ocr-por")
+            linhas.append("```")
+            linhas.append("")
+    
+    linhas.extend([
+        "---",
+        "",
+        "📖 Consulte o **README.md** para mais informações.",
+        ""
+    ])
+    
+    # Salva o arquivo
+    arquivo.parent.mkdir(parents=True, exist_ok=True)
+    with open(arquivo, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(linhas))
+
+    _dicas_gravadas.add(caminho_str)
+    return str(arquivo)
+
+def _resolver_backend(nome: str):
+    """
+    Resolve o nome do backend de parsing para a classe do docling.
+    Retorna None (= backend padrão do docling) para nomes desconhecidos ou
+    backends indisponíveis na versão instalada.
+    """
+    try:
+        if nome == 'pypdfium2':
+            from docling.backend.pypdfium2_backend import PyPdfiumDocumentBackend
+            return PyPdfiumDocumentBackend
+        if nome == 'dlparse_v4':
+            from docling.backend.docling_parse_v4_backend import DoclingParseV4DocumentBackend
+            return DoclingParseV4DocumentBackend
+        if nome == 'dlparse_v2':
+            from docling.backend.docling_parse_v2_backend import DoclingParseV2DocumentBackend
+            return DoclingParseV2DocumentBackend
+    except ImportError:
+        return None
+    return None
+
+
+@functools.lru_cache(maxsize=1)
+def _detectar_device() -> str:
+    """Detecta se há GPU CUDA disponível para acelerar os modelos do docling."""
+    try:
+        import torch
+        return 'cuda' if torch.cuda.is_available() else 'cpu'
+    except ImportError:
+        return 'cpu'
+
+
+def _criar_converter(do_ocr: bool, do_tables: bool, backend: str = 'pypdfium2',
+                     device: str = 'auto', num_threads: int = None,
+                     gerar_imagens: bool = False):
+    """
+    Constrói um DocumentConverter novo para a combinação de opções.
+    Use _build_converter para o conversor compartilhado do processo; esta
+    versão existe para a conversão em fatias, que precisa de um conversor
+    por thread. num_threads limita as threads dos modelos (None = todas
+    as CPUs).
+    """
+    from docling.document_converter import DocumentConverter, PdfFormatOption
+    from docling.datamodel.base_models import InputFormat
+    from docling.datamodel.pipeline_options import PdfPipelineOptions
+
+    # Habilita o profiling por etapa (alimenta o sidecar .timings.json)
+    try:
+        from docling.datamodel.settings import settings as docling_settings
+        docling_settings.debug.profile_pipeline_timings = True
+    except Exception:
+        pass
+
+    pipeline_options = PdfPipelineOptions()
+    pipeline_options.do_ocr = do_ocr
+    pipeline_options.do_table_structure = do_tables
+
+    # A tag <IMAGEM:nnn> só precisa do marcador, não dos pixels: sem as
+    # imagens de página o pipeline gasta menos memória e tempo por página
+    if hasattr(pipeline_options, 'generate_page_images'):
+        pipeline_options.generate_page_images = gerar_imagens
+
+    # Acelerador: move os modelos de layout/tabelas para a GPU quando houver
+    # (versões antigas do docling não expõem AcceleratorOptions)
+    try:
+        from docling.datamodel.pipeline_options import (AcceleratorDevice,
+                                                        AcceleratorOptions)
+        device_efetivo = _detectar_device() if device == 'auto' else device
+        acc_device = (AcceleratorDevice.CUDA if device_efetivo == 'cuda'
+                      else AcceleratorDevice.CPU)
+        pipeline_options.accelerator_options = AcceleratorOptions(
+            num_threads=num_threads or os.cpu_count() or 4,
+            device=acc_device
+        )
+    except ImportError:
+        pass
+
+    # Backend nativo em C++ (pypdfium2) acelera o parsing em ~15-20%
+    backend_cls = _resolver_backend(backend)
+    if backend_cls is not None:
+        format_option = PdfFormatOption(pipeline_options=pipeline_options,
+                                        backend=backend_cls)
+    else:
+        format_option = PdfFormatOption(pipeline_options=pipeline_options)
+
+    return DocumentConverter(
+        format_options={
+            InputFormat.PDF: format_option
+        }
+    )
+
+
+# Pool de conversores da conversão em fatias, por combinação de opções (a
+# mesma chave de _build_converter). Cada conversor é retirado para converter
+# uma fatia e devolvido em seguida — nunca há uso simultâneo —, e os modelos
+# carregados sobrevivem de um PDF chunkado para o próximo no mesmo processo
+_conversores_fatia = {}
+_conversores_fatia_lock = threading.Lock()
+
+
+def _obter_conversor_fatia(chave):
+    """Retira um conversor livre do pool (ou cria um para a chave)."""
+    with _conversores_fatia_lock:
+        livres = _conversores_fatia.setdefault(chave, [])
+        if livres:
+            return livres.pop()
+    return _criar_converter(*chave)
+
+
+def _devolver_conversor_fatia(chave, conversor):
+    """Devolve o conversor ao pool para reutilização futura."""
+    with _conversores_fatia_lock:
+        _conversores_fatia[chave].append(conversor)
+
+
+@functools.lru_cache(maxsize=8)
+def _build_converter(do_ocr: bool, do_tables: bool, backend: str = 'pypdfium2',
+                     device: str = 'auto', num_threads: int = None,
+                     gerar_imagens: bool = False):
+    """
+    Constrói (e reaproveita) um DocumentConverter para a combinação de opções.
+
+    O construtor do DocumentConverter carrega os modelos de layout/OCR/tabelas,
+    o que domina o custo de inicialização. O cache garante que cada processo
+    pague esse custo uma única vez por combinação de opções, independente do
+    número de PDFs processados.
+    """
+    return _criar_converter(do_ocr, do_tables, backend, device, num_threads,
+                            gerar_imagens)
+
+
+def _dividir_pdf_chunks(dados_pdf: bytes, paginas_por_chunk: int):
+    """
+    Divide o PDF em fatias de até paginas_por_chunk páginas com o pypdfium2,
+    devolvendo uma lista de (deslocamento_de_paginas, bytes_da_fatia).
+    Retorna None quando a divisão não se aplica (pypdfium2 ausente, PDF já
+    cabe em uma fatia ou erro de leitura) — o chamador segue pelo caminho
+    de chamada única.
+    """
+    try:
+        import pypdfium2 as pdfium
+        origem = pdfium.PdfDocument(dados_pdf)
+        try:
+            total = len(origem)
+            if total <= paginas_por_chunk:
+                return None
+            fatias = []
+            for inicio in range(0, total, paginas_por_chunk):
+                fim = min(inicio + paginas_por_chunk, total)
+                novo = pdfium.PdfDocument.new()
+                try:
+                    novo.import_pages(origem, list(range(inicio, fim)))
+                    buffer = io.BytesIO()
+                    novo.save(buffer)
+                    fatias.append((inicio, buffer.getvalue()))
+                finally:
+                    novo.close()
+            return fatias
+        finally:
+            origem.close()
+    except Exception:
+        return None
+
+
+def _pdf_tem_texto(caminho, max_paginas: int = 3, limiar_caracteres: int = 200) -> bool:
+    """
+    Detecta se o PDF já possui camada de texto, amostrando as primeiras páginas
+    com o pypdfium2. Usado pelo modo 'ocr: auto' para pular o OCR (o passo mais
+    caro do pipeline) em PDFs nativos de texto. Em caso de dúvida (erro de
+    leitura, pypdfium2 ausente) retorna False, mantendo o OCR por segurança.
+    """
+    try:
+        import pypdfium2 as pdfium
+        pdf = pdfium.PdfDocument(str(caminho))
+        try:
+            total = 0
+            for i in range(min(len(pdf), max_paginas)):
+                texto = pdf[i].get_textpage().get_text_range()
+                total += len(texto.strip())
+                if total >= limiar_caracteres:
+                    return True
+            return False
+        finally:
+            pdf.close()
+    except Exception:
+        return False
+
+
+def _ler_pdf_bytes(caminho) -> bytes:
+    """
+    Lê o PDF inteiro em uma única chamada, avisando o kernel do padrão de
+    acesso (posix_fadvise SEQUENTIAL/WILLNEED) para que o readahead comece
+    antes do read — sobrepõe o I/O de disco com o trabalho do processo.
+    """
+    fd = os.open(str(caminho), os.O_RDONLY)
+    try:
+        if hasattr(os, 'posix_fadvise'):
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            except OSError:
+                pass
+        with os.fdopen(fd, 'rb') as f:
+            fd = -1  # fdopen assume a posse do descritor
+            return f.read()
+    finally:
+        if fd >= 0:
+            os.close(fd)
+
+
+def _hash_pdf(dados: bytes) -> str:
+    """
+    Calcula o hash do conteúdo do PDF (identidade para o cache de extração).
+
+    Usa o BLAKE3 quando instalado (SIMD + multithread, várias vezes mais
+    rápido que o MD5 em PDFs grandes); sem ele, cai no MD5 da stdlib. Os dois
+    geram hexdigests distintos, então trocar de algoritmo apenas invalida o
+    cache antigo — sem risco de colisão entre esquemas.
+    """
+    try:
+        import blake3
+        return blake3.blake3(dados, max_threads=blake3.blake3.AUTO).hexdigest()
+    except ImportError:
+        import hashlib
+        return hashlib.md5(dados).hexdigest()
+
+
+def _copiar_arquivo(origem, destino):
+    """
+    Copia um arquivo com os.copy_file_range — a cópia acontece dentro do
+    kernel (com reflink/CoW no mesmo filesystem), sem passar os bytes pelo
+    espaço de usuário. Cai no shutil.copyfile onde a chamada não existe ou
+    o par de filesystems não a suporta.
+    """
+    if hasattr(os, 'copy_file_range'):
+        try:
+            fd_origem = os.open(str(origem), os.O_RDONLY)
+            try:
+                fd_destino = os.open(str(destino),
+                                     os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+                                     0o644)
+                try:
+                    restante = os.fstat(fd_origem).st_size
+                    while restante > 0:
+                        copiado = os.copy_file_range(fd_origem, fd_destino, restante)
+                        if copiado == 0:
+                            break
+                        restante -= copiado
+                    if restante == 0:
+                        return
+                finally:
+                    os.close(fd_destino)
+            finally:
+                os.close(fd_origem)
+        except OSError:
+            pass
+    shutil.copyfile(str(origem), str(destino))
+
+
+def _parse_paginas(especificacao):
+    """
+    Converte uma especificação de páginas como '1-3,10,50-' em uma lista de
+    intervalos 1-based (inicio, fim), onde fim None indica intervalo aberto
+    até o final do documento. Retorna None quando não há filtro.
+    """
+    if not especificacao:
+        return None
+    intervalos = []
+    for parte in str(especificacao).split(','):
+        parte = parte.strip()
+        if not parte:
+            continue
+        try:
+            if '-' in parte:
+                inicio, fim = parte.split('-', 1)
+                inicio = int(inicio) if inicio.strip() else 1
+                fim = int(fim) if fim.strip() else None
+            else:
+                inicio = fim = int(parte)
+        except ValueError:
+            raise ValueError(
+                f"Especificação de páginas inválida: {especificacao!r} "
+                "(use o formato '1-3,10,50-')") from None
+        intervalos.append((inicio, fim))
+    return intervalos or None
+
+
+def _pagina_incluida(num_pagina: int, intervalos) -> bool:
+    """Indica se a página pertence a algum dos intervalos (None = todas)."""
+    if intervalos is None:
+        return True
+    for inicio, fim in intervalos:
+        if num_pagina >= inicio and (fim is None or num_pagina <= fim):
+            return True
+    return False
+
+
+# Referências de imagem em markdown: ![alt](url), <img ...> e [image/figure/figura/imagem...]
+RE_IMAGENS_MD = re.compile(
+    r'!\[[^\]]*\]\([^\)]+\)'
+    r'|<img[^>]*>'
+    r'|\[(?:image|figure|figura|imagem)[^\]]*\]',
+    re.IGNORECASE
+)
+
+# Tags pré-formatadas: evita refazer o mesmo format de três dígitos por
+# página/imagem em lotes grandes (valores altos caem no f-string de sempre)
+_TAGS_PAGINA = tuple(f"<PAGINA:{i:03d}>" for i in range(1000))
+_TAGS_IMAGEM = tuple(f"<IMAGEM:{i:03d}>" for i in range(1000))
+
+
+def _tag_pagina(numero: int) -> str:
+    """Tag <PAGINA:nnn> pré-formatada para os números comuns."""
+    return _TAGS_PAGINA[numero] if 0 <= numero < 1000 else f"<PAGINA:{numero:03d}>"
+
+
+def _tag_imagem(numero: int) -> str:
+    """Tag <IMAGEM:nnn> pré-formatada para os números comuns."""
+    return _TAGS_IMAGEM[numero] if 0 <= numero < 1000 else f"<IMAGEM:{numero:03d}>"
+
+
+# Cache por classe do docling: evita lower() + três buscas de substring por item
+_CLASSES_IMAGEM_CACHE = {}
+
+
+def _item_eh_imagem(item) -> bool:
+    """Indica se o item do docling representa uma imagem/figura (cache por classe)."""
+    cls = type(item)
+    eh_imagem = _CLASSES_IMAGEM_CACHE.get(cls)
+    if eh_imagem is None:
+        nome = cls.__name__.lower()
+        eh_imagem = 'picture' in nome or 'image' in nome or 'figure' in nome
+        _CLASSES_IMAGEM_CACHE[cls] = eh_imagem
+    return eh_imagem
+
+
+RE_PALAVRAS = re.compile(r'\S+')
+RE_LIMPEZA_ESPACOS = re.compile(r'[ \t]+')
+RE_LIMPEZA_QUEBRAS = re.compile(r'\n{3,}')
+RE_LIMPEZA_REPETICAO = re.compile(r'([.,;+\-_?!:;()\[\]{}|@#$%^&*=~`\'])\1+')
+# Pares duplicados que indicam necessidade da passada de repetição
+_PARES_REPETICAO = tuple(c * 2 for c in ".,;+-_?!:()[]{}|@#$%^&*=~`'")
+def limpar_texto(texto: str) -> str:
+    """Limpa o texto removendo caracteres especiais excessivos e normalizando espaços."""
+    # Cada passada de regex só roda se uma busca simples de substring (bem mais
+    # barata) indicar que há algo a limpar — textos já limpos saem quase de graça
+    # Substitui múltiplos espaços horizontais por um único
+    if '\t' in texto or '  ' in texto:
+        texto = RE_LIMPEZA_ESPACOS.sub(' ', texto)
+    # Normaliza quebras de linha (no máximo 2 consecutivas)
+    if '\n\n\n' in texto:
+        texto = RE_LIMPEZA_QUEBRAS.sub('\n\n', texto)
+    # Substitui múltiplos caracters especiais pelo mesmo caractere uma vez
+    if any(par in texto for par in _PARES_REPETICAO):
+        texto = RE_LIMPEZA_REPETICAO.sub(r'\1', texto)
+    return texto.strip()
+
+class ExtrairPdf:
+    """Classe responsável por extrair texto de um único arquivo PDF em formato Markdown."""
+    
+    def __init__(self, arquivo_pdf: str, pasta_destino: str = None,
+                 pasta_log: str = None, ignorar_dependencias: bool = True,
+                 ocr=False, detectar_tabelas: bool = True,
+                 gerar_dicas: bool = True, verbose: bool = True,
+                 paginas: str = None, pasta_cache: str = None,
+                 sobrescrever_cache: bool = False, backend: str = 'pypdfium2',
+                 device: str = 'auto', paginas_por_chunk: int = 0,
+                 threads: int = None, gerar_imagens: bool = False):
+        """
+        Inicializa o extrator de PDF.
+
+        Args:
+            arquivo_pdf: Caminho do arquivo PDF
+            pasta_destino: Pasta de destino para os arquivos gerados
+            pasta_log: Pasta para os logs (se vazia, usa pasta_destino)
+            ignorar_dependencias: Se True, ignora erros de dependências opcionais genéricas
+            ocr: True usa OCR (requer Tesseract), False não usa (padrão) e
+                 'auto' só usa OCR se o PDF não tiver camada de texto.
+            detectar_tabelas: Se True, detecta estrutura de tabelas (requer libGL/OpenCV).
+            gerar_dicas: Se True, gera arquivo de dicas de ambiente
+            verbose: Se True, também imprime as mensagens de log no console
+            paginas: Páginas a extrair, ex: '1-3,10,50-' (None = todas)
+            pasta_cache: Pasta de cache por hash do PDF (None = sem cache)
+            sobrescrever_cache: Se True, ignora o cache e reprocessa o PDF
+            backend: Backend de parsing ('pypdfium2', 'dlparse_v4' ou 'dlparse_v2')
+            device: Dispositivo dos modelos: 'cuda', 'cpu' ou 'auto' (detecta)
+            paginas_por_chunk: Divide PDFs grandes em fatias desse tamanho e
+                 converte as fatias em paralelo (0 = desabilitado)
+            threads: Threads dos modelos do docling neste arquivo
+                 (None = todas as CPUs; em lote, as CPUs são divididas
+                 entre os workers)
+            gerar_imagens: Se True, o docling gera as imagens das páginas
+                 (a extração só usa o marcador <IMAGEM:nnn>, padrão False)
+        """
+        self.arquivo_pdf = Path(arquivo_pdf).resolve()
+        self.backend = backend
+        self.device = device
+        self.paginas_por_chunk = int(paginas_por_chunk or 0)
+        self.threads = threads
+        self.gerar_imagens = gerar_imagens
+        self.ignorar_dependencias = ignorar_dependencias
+        self.ocr = ocr
+        self.detectar_tabelas = detectar_tabelas
+        self.gerar_dicas = gerar_dicas
+        self.verbose = verbose
+        self.paginas = _parse_paginas(paginas)
+        self.pasta_cache = Path(pasta_cache).resolve() if pasta_cache else None
+        self.sobrescrever_cache = sobrescrever_cache
+        
+        # Define pasta de destino
+        if pasta_destino:
+            self.pasta_destino = Path(pasta_destino).resolve()
+        else:
+            self.pasta_destino = self.arquivo_pdf.parent
+        
+        # Define pasta de log (se não especificada, usa pasta_destino)
+        if pasta_log:
+            self.pasta_log = Path(pasta_log).resolve()
+        else:
+            self.pasta_log = self.pasta_destino
+        
+        # Cria pastas se não existirem
+        self.pasta_destino.mkdir(parents=True, exist_ok=True)
+        self.pasta_log.mkdir(parents=True, exist_ok=True)
+        
+        # Define arquivos de saída (agora .md para markdown)
+        nome_base = self.arquivo_pdf.stem
+        self.arquivo_md = self.pasta_destino / f"{nome_base}.md"
+        self.arquivo_log = self.pasta_log / f"{nome_base}.log"
+
+        # Log com escrita bufferizada direto no arquivo (sem acumular em memória)
+        self._log_fh = open(self.arquivo_log, 'w', encoding='utf-8', buffering=65536)
+
+        # Contador de imagens
+        self.contador_imagens = 0
+
+    def _adicionar_log(self, mensagem: str):
+        """Adiciona uma mensagem ao log."""
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        entrada_log = f"[{timestamp}] {mensagem}"
+        # Uma única chamada de write por linha (o buffer de 64 KiB agrega no disco)
+        self._log_fh.write(entrada_log + '\n')
+        if self.verbose:
+            print(entrada_log)
+
+    def _salvar_log(self):
+        """Descarrega o buffer do log individual para o disco."""
+        if not self._log_fh.closed:
+            self._log_fh.flush()
+
+    def __del__(self):
+        try:
+            if not self._log_fh.closed:
+                self._log_fh.close()
+        except Exception:
+            pass
+    
+    def _verificar_dependencias(self) -> bool:
+        """
+        Verifica se as dependências estão disponíveis.
+        Retorna False se dependências críticas estiverem faltando.
+        """
+        if not _docling_disponivel():
+            self._adicionar_log("ERRO CRÍTICO: O pacote 'docling' não está instalado.")
+            self._adicionar_log("Instale com: pip install docling")
+            return False
+        
+        deps = verificar_dependencias_opcionais()
+        
+        # Cria arquivo de dicas (rastreabilidade do ambiente)
+        if self.gerar_dicas:
+            arquivo_dicas = criar_dicas_ambiente(str(self.pasta_log), deps)
+            if arquivo_dicas:
+                 self._adicionar_log(f"Informações do ambiente salvas em: {arquivo_dicas}")
+
+        # Lógica de Tabelas (libGL)
+        if self.detectar_tabelas:
+            if not deps['libgl']:
+                self._adicionar_log("ERRO: Detecção de tabelas habilitada (detectar_tabelas: true) mas libGL/OpenCV não encontrado.")
+                self._adicionar_log("Solução 1: Instale dependências gráficas (veja dicas_ambiente.md)")
+                self._adicionar_log("Solução 2: Desabilite Tabelas no config (detectar_tabelas: false)")
+                return False
+        else:
+            if not deps['libgl']:
+                 self._adicionar_log("AVISO: libGL/OpenCV não encontrado, mas Tabelas está desabilitado.")
+
+        # Lógica do OCR
+        if self.ocr:
+            if not deps['tesseract']:
+                self._adicionar_log("ERRO: OCR habilitado (ocr: true) mas Tesseract não encontrado.")
+                self._adicionar_log("Solução 1: Instale o Tesseract (veja dicas_ambiente.md)")
+                self._adicionar_log("Solução 2: Desabilite o OCR no config (ocr: false)")
+                return False
+        else:
+            if not deps['tesseract']:
+                 self._adicionar_log("AVISO: Tesseract não encontrado, mas OCR está desabilitado.")
+        
+        return True
+    
+    def _opcoes_cache(self) -> dict:
+        """Opções que influenciam o markdown gerado (validam um hit de cache)."""
+        return {
+            'ocr': bool(self.ocr),
+            'detectar_tabelas': bool(self.detectar_tabelas),
+            'paginas': str(self.paginas)
+        }
+
+    def _carregar_cache(self, hash_pdf: str):
+        """
+        Retorna o caminho do resultado.md em cache para o hash do PDF, ou
+        None quando não há entrada válida. Devolver o caminho (em vez do
+        conteúdo) permite restaurar o hit por cópia dentro do kernel.
+        """
+        pasta = self.pasta_cache / hash_pdf
+        resultado = pasta / 'resultado.md'
+        try:
+            with open(pasta / 'meta.json', 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            # Só reutiliza se as opções de extração forem as mesmas
+            if meta.get('opcoes') != self._opcoes_cache():
+                return None
+            if not resultado.exists():
+                return None
+            return resultado
+        except (OSError, ValueError):
+            return None
+
+    def _gravar_cache(self, hash_pdf: str):
+        """
+        Copia o .md recém-gravado para o cache (falhas não interrompem a
+        extração). A cópia usa copy_file_range, sem reler o conteúdo.
+        """
+        try:
+            pasta = self.pasta_cache / hash_pdf
+            pasta.mkdir(parents=True, exist_ok=True)
+            _copiar_arquivo(self.arquivo_md, pasta / 'resultado.md')
+            meta = {'arquivo': self.arquivo_pdf.name, 'opcoes': self._opcoes_cache()}
+            with open(pasta / 'meta.json', 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+        except OSError as e:
+            self._adicionar_log(f"AVISO: Não foi possível gravar o cache: {e}")
+
+    def _substituir_imagens_markdown(self, texto_md: str) -> str:
+        """Substitui referências de imagens no markdown por tags <IMAGEM:nnn>."""
+        def substituir(match):
+            self.contador_imagens += 1
+            return _tag_imagem(self.contador_imagens)
+
+        # Uma única passada com o padrão combinado (em vez de uma por padrão)
+        return RE_IMAGENS_MD.sub(substituir, texto_md)
+
+    def _gravar_timings(self, resultado):
+        """
+        Grava um sidecar <nome>.timings.json com os tempos por etapa que o
+        profiling do docling coletou. O formato legível por máquina permite
+        comparar backend/device/threads entre execuções sem varrer os logs
+        de texto. Falhas aqui nunca interrompem a extração.
+        """
+        try:
+            tempos = getattr(resultado, 'timings', None)
+            if not tempos:
+                return
+            dados = {}
+            for etapa, medicao in tempos.items():
+                valores = getattr(medicao, 'times', None)
+                if valores:
+                    dados[str(etapa)] = {'total': round(sum(valores), 4),
+                                         'execucoes': len(valores)}
+            if not dados:
+                return
+            arquivo = self.pasta_log / f"{self.arquivo_pdf.stem}.timings.json"
+            with open(arquivo, 'w', encoding='utf-8') as f:
+                json.dump(dados, f, ensure_ascii=False, indent=1)
+            self._adicionar_log(f"Tempos por etapa salvos em: {arquivo.name}")
+        except Exception:
+            pass
+
+    def _montar_partes(self, documento, deslocamento: int = 0):
+        """
+        Percorre os itens do documento em uma única passada montando a lista
+        de partes do markdown, com a tag de página emitida quando ela muda
+        (iterate_items devolve na ordem do documento). O deslocamento ajusta
+        a numeração quando o documento é uma fatia do PDF original.
+        Retorna (partes, paginas_vistas).
+        """
+        partes = []
+        paginas_vistas = set()
+        pagina_atual = None
+
+        for item, nivel in documento.iterate_items():
+            # Obtém o número da página
+            num_pagina = 1
+            if hasattr(item, 'prov') and item.prov:
+                for prov in item.prov:
+                    if hasattr(prov, 'page_no'):
+                        num_pagina = prov.page_no
+                        break
+            num_pagina += deslocamento
+
+            # Pula páginas fora do filtro antes de exportar o conteúdo
+            if not _pagina_incluida(num_pagina, self.paginas):
+                continue
+
+            # Obtém conteúdo em markdown
+            conteudo = ""
+            if _item_eh_imagem(item):
+                self.contador_imagens += 1
+                conteudo = _tag_imagem(self.contador_imagens)
+            elif hasattr(item, 'export_to_markdown'):
+                try:
+                    conteudo = item.export_to_markdown(documento)
+                except TypeError:
+                    try:
+                        conteudo = item.export_to_markdown()
+                    except Exception:
+                        if hasattr(item, 'text') and item.text:
+                            conteudo = item.text
+            elif hasattr(item, 'text') and item.text:
+                conteudo = item.text
+
+            if conteudo:
+                if num_pagina != pagina_atual:
+                    if pagina_atual is not None:
+                        partes.append('\n')
+                    partes.append('\n' + _tag_pagina(num_pagina) + '\n\n')
+                    pagina_atual = num_pagina
+                    paginas_vistas.add(num_pagina)
+                else:
+                    partes.append('\n\n')
+                partes.append(conteudo)
+
+        return partes, paginas_vistas
+
+    def _converter_em_chunks(self, dados_pdf: bytes, do_ocr: bool, do_tables: bool):
+        """
+        Converte o PDF em fatias paralelas de paginas_por_chunk páginas.
+
+        Uma chamada única do docling é serial por página no modelo de layout;
+        fatiar o PDF com o pypdfium2 e converter as fatias em threads (os
+        modelos trabalham em código nativo, fora do GIL) explora paralelismo
+        dentro de um mesmo documento grande. Retorna (partes, paginas_vistas)
+        ou None quando o fatiamento não se aplica.
+        """
+        fatias = _dividir_pdf_chunks(dados_pdf, self.paginas_por_chunk)
+        if not fatias:
+            return None
+        try:
+            from docling.datamodel.base_models import DocumentStream
+        except ImportError:
+            return None
+
+        self._adicionar_log(f"Convertendo em {len(fatias)} fatias de até "
+                            f"{self.paginas_por_chunk} páginas em paralelo")
+
+        # Conversores vêm do pool do módulo (retirados enquanto convertem a
+        # fatia, sem uso simultâneo): os modelos são carregados no máximo
+        # max_threads vezes no total, reaproveitados inclusive entre PDFs
+        # chunkados sucessivos do mesmo processo
+        chave = (do_ocr, do_tables, self.backend, self.device,
+                 self.threads, self.gerar_imagens)
+
+        def converter_fatia(fatia):
+            deslocamento, dados = fatia
+            conversor = _obter_conversor_fatia(chave)
+            try:
+                fonte = DocumentStream(
+                    name=f"{self.arquivo_pdf.stem}.p{deslocamento + 1}.pdf",
+                    stream=io.BytesIO(dados)
+                )
+                return conversor.convert(fonte).document
+            finally:
+                _devolver_conversor_fatia(chave, conversor)
+
+        max_threads = min(len(fatias), os.cpu_count() or 4)
+        with ThreadPoolExecutor(max_workers=max_threads) as executor:
+            # map preserva a ordem das fatias; a montagem abaixo fica serial
+            # para manter a numeração de páginas e imagens consistente
+            documentos = list(executor.map(converter_fatia, fatias))
+
+        partes = []
+        paginas_vistas = set()
+        for (deslocamento, _dados), documento in zip(fatias, documentos):
+            if partes:
+                partes.append('\n')
+            partes_fatia, vistas = self._montar_partes(documento, deslocamento)
+            partes.extend(partes_fatia)
+            paginas_vistas.update(vistas)
+        return partes, paginas_vistas
+
+
+    def extrair(self) -> bool:
+        """
+        Extrai o texto do PDF em formato Markdown usando Docling.
+        Retorna True se bem-sucedido, False caso contrário.
+        """
+        self._adicionar_log(f"Iniciando extração: {self.arquivo_pdf}")
+        
+        # Verifica se o arquivo existe
+        if not self.arquivo_pdf.exists():
+            self._adicionar_log(f"ERRO: Arquivo não encontrado: {self.arquivo_pdf}")
+            self._salvar_log()
+            return False
+        
+        # Lê o PDF inteiro de uma vez: o buffer alimenta o hash do cache e o
+        # próprio Docling, evitando os reads pequenos que o backend faria ao
+        # navegar a xref do arquivo (caro em pastas de rede)
+        try:
+            dados_pdf = _ler_pdf_bytes(self.arquivo_pdf)
+        except OSError as e:
+            self._adicionar_log(f"ERRO: Falha ao ler o arquivo: {e}")
+            self._salvar_log()
+            return False
+
+        # Resolve o modo 'auto' do OCR: PDFs com camada de texto dispensam OCR
+        if isinstance(self.ocr, str) and self.ocr.lower() == 'auto':
+            if _pdf_tem_texto(self.arquivo_pdf):
+                self._adicionar_log("OCR automático: camada de texto detectada, OCR desabilitado")
+                self.ocr = False
+            else:
+                self._adicionar_log("OCR automático: sem camada de texto, OCR habilitado")
+                self.ocr = True
+
+        # Cache de extração: reutiliza resultados de execuções anteriores
+        # (o hash identifica o conteúdo, então renomear o PDF não invalida)
+        hash_pdf = None
+        if self.pasta_cache:
+            hash_pdf = _hash_pdf(dados_pdf)
+            if not self.sobrescrever_cache:
+                resultado_cache = self._carregar_cache(hash_pdf)
+                if resultado_cache is not None:
+                    self._adicionar_log(f"Cache encontrado ({hash_pdf}), pulando conversão")
+                    # Cópia dentro do kernel: os bytes não sobem ao processo
+                    _copiar_arquivo(resultado_cache, self.arquivo_md)
+                    self._adicionar_log(f"Markdown restaurado do cache em: {self.arquivo_md}")
+                    self._salvar_log()
+                    return True
+
+        # Verifica dependências
+        if not self._verificar_dependencias():
+            self._salvar_log()
+            return False
+
+        try:
+            # Configura o conversor
+            self._adicionar_log("Inicializando DocumentConverter...")
+            
+            # Verifica quais features podem ser habilitadas
+            deps = verificar_dependencias_opcionais()
+            
+            do_ocr = self.ocr and bool(deps['tesseract'])
+            do_tables = self.detectar_tabelas and bool(deps['libgl'])
+
+            if do_ocr:
+                self._adicionar_log("OCR habilitado")
+            else:
+                self._adicionar_log("OCR desabilitado")
+
+            if do_tables:
+                self._adicionar_log("Detecção de tabelas habilitada")
+            else:
+                self._adicionar_log("Detecção de tabelas desabilitada")
+
+            # Converte o documento
+            self._adicionar_log("Convertendo documento...")
+            if self.paginas:
+                self._adicionar_log(f"Filtro de páginas ativo: {self.paginas}")
+
+            # Conversão em fatias paralelas para PDFs grandes (combinada com
+            # filtro de páginas a conta não fecha, então fica na chamada única)
+            documento = None
+            montado = None
+            if self.paginas_por_chunk > 0 and not self.paginas:
+                montado = self._converter_em_chunks(dados_pdf, do_ocr, do_tables)
+
+            if montado is None:
+                # Reaproveita o conversor (modelos já carregados) entre PDFs do processo
+                converter = _build_converter(do_ocr, do_tables, self.backend,
+                                             self.device, self.threads,
+                                             self.gerar_imagens)
+
+                # Entrega o buffer já lido ao Docling (DocumentStream); versões
+                # antigas sem DocumentStream caem no caminho por arquivo
+                try:
+                    from docling.datamodel.base_models import DocumentStream
+                    fonte = DocumentStream(name=self.arquivo_pdf.name,
+                                           stream=io.BytesIO(dados_pdf))
+                except ImportError:
+                    fonte = str(self.arquivo_pdf)
+
+                # Intervalo único e fechado pode ser delegado ao Docling, que então
+                # nem processa as demais páginas (ganho proporcional ao que é pulado)
+                if self.paginas and len(self.paginas) == 1 and self.paginas[0][1] is not None:
+                    try:
+                        resultado = converter.convert(fonte, page_range=self.paginas[0])
+                    except TypeError:
+                        # Versões antigas do docling não aceitam page_range;
+                        # o filtro por item abaixo cobre o resultado
+                        resultado = converter.convert(fonte)
+                else:
+                    resultado = converter.convert(fonte)
+
+                # Extrai o documento
+                documento = resultado.document
+
+                # Sidecar com os tempos por etapa (layout, OCR, tabelas...)
+                self._gravar_timings(resultado)
+
+                # Processa página por página para adicionar tags
+                self._adicionar_log("Processando páginas...")
+                montado = self._montar_partes(documento)
+
+            partes, paginas_vistas = montado
+
+            # Finaliza o markdown (lista + join evita concatenação O(n²))
+            if partes:
+                partes.append('\n')
+                markdown_final = ''.join(partes)
+                # Processa referências de imagens que podem ter vindo no markdown
+                # (uma única passada sobre o documento inteiro)
+                markdown_final = self._substituir_imagens_markdown(markdown_final)
+            elif self.paginas is not None:
+                # Com filtro ativo, lista vazia significa que nenhuma página
+                # casou com a especificação — o fallback de documento inteiro
+                # entregaria exatamente o que o usuário pediu para excluir
+                self._adicionar_log(f"Aviso: Nenhuma página casou com o filtro {self.paginas}, gerando resultado vazio")
+                markdown_final = ""
+            else:
+                # Fallback: usa o markdown completo do documento
+                self._adicionar_log("Aviso: Não foi possível separar por páginas, usando markdown completo")
+                if documento is not None:
+                    markdown_final = f"<PAGINA:001>\n\n{documento.export_to_markdown()}"
+                else:
+                    markdown_final = ""
+                markdown_final = self._substituir_imagens_markdown(markdown_final)
+            
+            # Limpeza final do texto
+            self._adicionar_log("Aplicando limpeza de texto (ruídos)...")
+            markdown_final = limpar_texto(markdown_final)
+            
+            # Salva o arquivo markdown
+            self._adicionar_log(f"Salvando markdown em: {self.arquivo_md}")
+            with open(self.arquivo_md, 'w', encoding='utf-8',
+                      buffering=1 << 20) as f:
+                f.write(markdown_final.strip())
+
+            # Alimenta o cache para execuções futuras
+            if hash_pdf:
+                self._gravar_cache(hash_pdf)
+
+            # Estatísticas
+            num_caracteres = len(markdown_final)
+            # Conta em streaming: split() materializaria uma lista com todas as palavras
+            num_palavras = sum(1 for _ in RE_PALAVRAS.finditer(markdown_final))
+            num_paginas = len(paginas_vistas) if paginas_vistas else 1
+            
+            self._adicionar_log(f"Extração concluída com sucesso!")
+            self._adicionar_log(f"  - Páginas: {num_paginas}")
+            self._adicionar_log(f"  - Imagens detectadas: {self.contador_imagens}")
+            self._adicionar_log(f"  - Caracteres: {num_caracteres}")
+            self._adicionar_log(f"  - Palavras: ~{num_palavras}")
+            
+            self._salvar_log()
+            return True
+            
+        except Exception as e:
+            self._adicionar_log(f"ERRO durante extração: {str(e)}")
+            import traceback
+            self._adicionar_log(f"Traceback: {traceback.format_exc()}")
+            self._salvar_log()
+            return False
+
+
+# Todas as variações de caixa de '.pdf': str.endswith com tupla compara em C,
+# sem o str minúsculo temporário que nome.lower() alocaria por arquivo
+_SUFIXOS_PDF = tuple(
+    '.' + p + d + f
+    for p in 'pP' for d in 'dD' for f in 'fF'
+)
+
+
+def _iter_pdfs(raiz, recursivo: bool):
+    """
+    Percorre a árvore com os.scandir devolvendo caminhos (str) de PDFs.
+
+    O DirEntry reaproveita os dados de stat da própria listagem do diretório,
+    então is_file()/is_dir() não geram syscalls extras. Pastas ocultas
+    (iniciadas por '.') são puladas cedo, sem descer nelas.
+    """
+    pilha = [str(raiz)]
+    while pilha:
+        atual = pilha.pop()
+        try:
+            with os.scandir(atual) as entradas:
+                for entrada in entradas:
+                    nome = entrada.name
+                    if entrada.is_dir(follow_symlinks=False):
+                        if recursivo and not nome.startswith('.'):
+                            pilha.append(entrada.path)
+                    elif nome.endswith(_SUFIXOS_PDF) and entrada.is_file(follow_symlinks=False):
+                        yield entrada.path
+        except OSError:
+            continue
+
+
+def _listar_mds_existentes(raiz):
+    """
+    Coleta em um set os caminhos (str) dos .md já presentes na pasta de
+    destino. Uma varredura única substitui um exists() por PDF na montagem
+    das tarefas — em reprocessamentos incrementais com milhares de arquivos,
+    os stats individuais viram consultas em memória.
+    """
+    existentes = set()
+    pilha = [str(raiz)]
+    while pilha:
+        atual = pilha.pop()
+        try:
+            with os.scandir(atual) as entradas:
+                for entrada in entradas:
+                    if entrada.is_dir(follow_symlinks=False):
+                        pilha.append(entrada.path)
+                    elif entrada.name.endswith('.md'):
+                        existentes.add(entrada.path)
+        except OSError:
+            continue
+    return existentes
+
+
+class ListarArquivosPdf:
+    """Classe utilitária para listar arquivos PDF em uma pasta."""
+    
+    @classmethod
+    def listar(cls, pasta_origem: str, subpastas: bool = True) -> list:
+        """
+        Lista todos os arquivos PDF em uma pasta.
+        
+        Args:
+            pasta_origem: Caminho da pasta de origem
+            subpastas: Se True, busca recursivamente em subpastas
+            
+        Returns:
+            Lista de caminhos completos dos arquivos PDF encontrados
+        """
+        pasta = Path(pasta_origem).resolve()
+        
+        if not pasta.exists():
+            print(f"ERRO: Pasta não encontrada: {pasta}")
+            return []
+        
+        if not pasta.is_dir():
+            print(f"ERRO: Não é uma pasta: {pasta}")
+            return []
+        
+        # Busca arquivos PDF em uma única varredura com os.scandir
+        # (um só percurso atende .pdf e .PDF, sem necessidade de deduplicar).
+        # O laço trabalha com strings — o construtor de Path é caro e só é
+        # pago uma vez por arquivo, na conversão final
+        caminhos = _iter_pdfs(pasta, subpastas)
+        return [Path(caminho) for caminho in sorted(caminhos)]
+
+
+def _inicializar_worker(threads: int = 1):
+    """Inicializa um processo worker limitando as threads internas do Docling/torch.
+
+    Sem esse limite, cada worker tenta usar todos os núcleos (OpenMP/torch),
+    gerando mais threads do que CPUs disponíveis e degradando o paralelismo
+    entre arquivos. O teto acompanha threads_por_arquivo — os modelos rodam
+    sobre OpenMP, então um limite fixo anularia o num_threads do acelerador.
+    """
+    os.environ['OMP_THREAD_LIMIT'] = str(max(1, threads))
+
+
+def _processar_um(args):
+    """
+    Processa um único PDF em um processo worker (precisa ser picklável).
+
+    Args:
+        args: Tupla (arquivo_pdf, pasta_destino, pasta_log, ignorar_dependencias,
+              ocr, detectar_tabelas, paginas, pasta_cache, sobrescrever_cache,
+              backend, device, paginas_por_chunk, threads, gerar_imagens)
+
+    Returns:
+        Dicionário com 'arquivo', 'sucesso', 'erro' (mensagem ou None) e
+        'duracao' (segundos de parede gastos no arquivo)
+    """
+    (arquivo_pdf, pasta_destino, pasta_log, ignorar_dependencias,
+     ocr, detectar_tabelas, paginas, pasta_cache, sobrescrever_cache,
+     backend, device, paginas_por_chunk, threads, gerar_imagens) = args
+    inicio = time.perf_counter()
+    try:
+        extrator = ExtrairPdf(
+            arquivo_pdf,
+            pasta_destino,
+            pasta_log=pasta_log,
+            ignorar_dependencias=ignorar_dependencias,
+            ocr=ocr,
+            detectar_tabelas=detectar_tabelas,
+            paginas=paginas,
+            pasta_cache=pasta_cache,
+            sobrescrever_cache=sobrescrever_cache,
+            backend=backend,
+            device=device,
+            paginas_por_chunk=paginas_por_chunk,
+            threads=threads,
+            gerar_imagens=gerar_imagens,
+            gerar_dicas=False,  # Já gerado na pasta principal
+            verbose=False  # Evita serializar prints dos workers no console
+        )
+        sucesso = extrator.extrair()
+        return {'arquivo': arquivo_pdf, 'sucesso': sucesso, 'erro': None,
+                'duracao': time.perf_counter() - inicio}
+    except Exception as e:
+        return {'arquivo': arquivo_pdf, 'sucesso': False, 'erro': str(e),
+                'duracao': time.perf_counter() - inicio}
+
+
+class ProcessarPasta:
+    """Classe para processar múltiplos PDFs de uma pasta baseado em configuração YAML."""
+    
+    def __init__(self, config_ou_yaml: str = None, pasta_origem: str = None, 
+                 pasta_destino: str = None, pasta_log: str = None,
+                 subpastas: bool = True, sobrescrever: bool = False,
+                 ignorar_dependencias: bool = True, ocr=False,
+                 detectar_tabelas: bool = True, workers: int = None,
+                 paginas: str = None, pasta_cache: str = None,
+                 sobrescrever_cache: bool = False, backend: str = 'pypdfium2',
+                 device: str = 'auto', paginas_por_chunk: int = 0,
+                 threads_por_arquivo: int = None, gerar_imagens: bool = False):
+        """
+        Inicializa o processador de pasta.
+
+        Args:
+            config_ou_yaml: Caminho para arquivo YAML de configuração (opcional)
+            pasta_origem: Pasta de origem (se não usar YAML)
+            pasta_destino: Pasta de destino (se não usar YAML)
+            pasta_log: Pasta para logs (se não usar YAML, padrão pasta_destino)
+            subpastas: Processar subpastas (padrão True)
+            sobrescrever: Sobrescrever arquivos existentes (padrão False)
+            ignorar_dependencias: Ignorar erros de dependências opcionais (padrão True)
+            ocr: True habilita OCR, False desabilita (padrão) e 'auto'
+                 só usa OCR nos PDFs sem camada de texto
+            detectar_tabelas: Habilitar detecção de tabelas (padrão True)
+            workers: Número de processos paralelos (padrão: min(CPUs, 4))
+            paginas: Páginas a extrair de cada PDF, ex: '1-3,10,50-' (None = todas)
+            pasta_cache: Pasta de cache por hash do PDF (None = sem cache)
+            sobrescrever_cache: Se True, ignora o cache e reprocessa os PDFs
+            backend: Backend de parsing ('pypdfium2', 'dlparse_v4' ou 'dlparse_v2')
+            device: Dispositivo dos modelos: 'cuda', 'cpu' ou 'auto' (detecta)
+            paginas_por_chunk: Divide PDFs grandes em fatias desse tamanho e
+                 converte as fatias em paralelo (0 = desabilitado)
+            threads_por_arquivo: Threads dos modelos em cada worker
+                 (padrão: CPUs divididas pelos workers, nenhum núcleo ocioso)
+            gerar_imagens: Se True, o docling gera as imagens das páginas
+                 (a extração só usa o marcador <IMAGEM:nnn>, padrão False)
+        """
+        self.ignorar_dependencias = ignorar_dependencias
+        self.ocr = ocr
+        self.detectar_tabelas = detectar_tabelas
+        self.pasta_log = None
+        self.workers = workers
+        self.paginas = paginas
+        self.pasta_cache = pasta_cache
+        self.sobrescrever_cache = sobrescrever_cache
+        self.backend = backend
+        self.device = device
+        self.paginas_por_chunk = paginas_por_chunk
+        self.threads_por_arquivo = threads_por_arquivo
+        self.gerar_imagens = gerar_imagens
+
+        # Se recebeu um arquivo YAML, carrega as configurações
+        # (a extensão é isolada com splitext: evita baixar a caixa do caminho
+        # inteiro e passa a aceitar também a variação .yml)
+        if (config_ou_yaml
+                and os.path.splitext(config_ou_yaml)[1].lower() in ('.yaml', '.yml')):
+            self._carregar_yaml(config_ou_yaml)
+        else:
+            self.pasta_origem = Path(pasta_origem).resolve() if pasta_origem else None
+            self.pasta_destino = Path(pasta_destino).resolve() if pasta_destino else self.pasta_origem
+            self.pasta_log = Path(pasta_log).resolve() if pasta_log else None
+            self.subpastas = subpastas
+            self.sobrescrever = sobrescrever
+
+        # Define o número de workers (padrão: até 4, limitado pelas CPUs —
+        # cada worker do Docling consome muita memória com os modelos)
+        if not self.workers:
+            self.workers = min(os.cpu_count() or 4, 4)
+        
+        # Define pasta de log (se não especificada, usa pasta_destino)
+        if not self.pasta_log:
+            self.pasta_log = self.pasta_destino
+        
+        # Cria pasta de log se não existir
+        if self.pasta_log:
+            self.pasta_log.mkdir(parents=True, exist_ok=True)
+        
+        # Log geral
+        if self.pasta_log:
+            self.arquivo_log = self.pasta_log / 'log_extração.txt'
+        elif self.pasta_origem:
+            self.arquivo_log = self.pasta_origem / 'log_extração.txt'
+        else:
+            self.arquivo_log = Path('log_extração.txt')
+
+        # Log com escrita bufferizada direto no arquivo (sem acumular em memória)
+        self._log_fh = open(self.arquivo_log, 'w', encoding='utf-8', buffering=65536)
+        self.verbose = True
+
+
+        # Estatísticas (agregadas em um único Counter)
+        self.stats = Counter()
+    
+    def _carregar_yaml(self, caminho_yaml: str):
+        """Carrega configurações de um arquivo YAML (com cache JSON por mtime)."""
+        config = None
+
+
+        # Cache em JSON: parse de JSON é bem mais rápido que YAML em execuções repetidas
+        cache_json = caminho_yaml + '.cache.json'
+        try:
+            if os.path.getmtime(cache_json) >= os.path.getmtime(caminho_yaml):
+                with open(cache_json, 'r', encoding='utf-8') as f:
+                    config = json.load(f)
+        except (OSError, ValueError):
+            config = None
+
+        if config is None:
+            # Import tardio: o yaml só é necessário quando o cache JSON não atende
+            import yaml
+            try:
+                from yaml import CSafeLoader as _YamlLoader
+            except ImportError:
+                from yaml import SafeLoader as _YamlLoader
+            with open(caminho_yaml, 'r', encoding='utf-8') as f:
+                config = yaml.load(f, Loader=_YamlLoader)
+            try:
+                with open(cache_json, 'w', encoding='utf-8') as f:
+                    json.dump(config, f, ensure_ascii=False)
+            except OSError:
+                pass  # Cache é opcional (ex.: pasta somente leitura)
+
+        self.pasta_origem = Path(config.get('pasta_origem', '.')).resolve()
+        
+        pasta_dest = config.get('pasta_destino', '')
+        if pasta_dest:
+            self.pasta_destino = Path(pasta_dest).resolve()
+        else:
+            self.pasta_destino = self.pasta_origem
+        
+        # Pasta de log (se não especificada, usa pasta_destino)
+        pasta_log = config.get('pasta_log', '')
+        if pasta_log:
+            self.pasta_log = Path(pasta_log).resolve()
+        else:
+            self.pasta_log = None  # será definida depois como pasta_destino
+            
+        self.subpastas = config.get('subpastas', True)
+        self.sobrescrever = config.get('sobrescrever', False)
+        self.ignorar_dependencias = config.get('ignorar_dependencias', True)
+        self.ocr = config.get('ocr', False)
+        self.detectar_tabelas = config.get('detectar_tabelas', True)
+        self.workers = config.get('workers', self.workers)
+        self.paginas = config.get('paginas', self.paginas)
+        self.pasta_cache = config.get('pasta_cache', self.pasta_cache)
+        self.sobrescrever_cache = config.get('sobrescrever_cache', self.sobrescrever_cache)
+        self.backend = config.get('backend', self.backend)
+        self.device = config.get('device', self.device)
+        self.paginas_por_chunk = config.get('paginas_por_chunk', self.paginas_por_chunk)
+        self.threads_por_arquivo = config.get('threads_por_arquivo', self.threads_por_arquivo)
+        self.gerar_imagens = config.get('gerar_imagens', self.gerar_imagens)
+        
+    def _adicionar_log(self, mensagem: str):
+        """Adiciona uma mensagem ao log geral."""
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        entrada_log = f"[{timestamp}] {mensagem}"
+        # Uma única chamada de write por linha (o buffer de 64 KiB agrega no disco)
+        self._log_fh.write(entrada_log + '\n')
+        if self.verbose:
+            print(entrada_log)
+
+    def _salvar_log(self):
+        """Descarrega o buffer do log geral para o disco."""
+        if not self._log_fh.closed:
+            self._log_fh.flush()
+
+    def __del__(self):
+        try:
+            if not self._log_fh.closed:
+                self._log_fh.close()
+        except Exception:
+            pass
+
+
+    def _caminho_relativo(self, arquivo_pdf: Path) -> Path:
+        """
+        Calcula o caminho da pasta do arquivo relativo à pasta de origem,
+        preservando a estrutura de subpastas ('' se estiver fora da origem).
+        """
+        try:
+            return arquivo_pdf.parent.relative_to(self.pasta_origem)
+        except ValueError:
+            # Se não conseguir calcular relativo, usa a pasta de destino diretamente
+            return Path('')
+    
+    def processar(self) -> dict:
+        """
+        Processa todos os PDFs da pasta de origem.
+        
+        Returns:
+            Dicionário com estatísticas do processamento
+        """
+        self._adicionar_log("=" * 60)
+        self._adicionar_log("INICIANDO PROCESSAMENTO EM LOTE")
+        self._adicionar_log("=" * 60)
+        self._adicionar_log(f"Pasta de origem: {self.pasta_origem}")
+        self._adicionar_log(f"Pasta de destino: {self.pasta_destino}")
+        self._adicionar_log(f"Incluir subpastas: {self.subpastas}")
+        self._adicionar_log(f"Sobrescrever existentes: {self.sobrescrever}")
+        self._adicionar_log(f"Utilizar OCR: {self.ocr}")
+        self._adicionar_log(f"Detectar Tabelas: {self.detectar_tabelas}")
+        self._adicionar_log(f"Ignorar dependências opcionais: {self.ignorar_dependencias}")
+        self._adicionar_log("-" * 60)
+        
+        # Log das dependências disponíveis
+        deps = verificar_dependencias_opcionais()
+        self._adicionar_log(f"Dependências: libGL={deps['libgl']}, tesseract={deps['tesseract']}")
+        
+        # Cria arquivo de dicas (rastreabilidade do ambiente)
+        arquivo_dicas = criar_dicas_ambiente(str(self.pasta_log), deps)
+        if arquivo_dicas:
+            self._adicionar_log(f"Informações do ambiente salvas em: {arquivo_dicas}")
+
+        # Validação do OCR (o modo 'auto' decide por arquivo, então só valida aqui
+        # quando o OCR foi habilitado explicitamente)
+        if self.ocr == 'auto' and not deps['tesseract']:
+            self._adicionar_log("AVISO: ocr 'auto' sem Tesseract instalado — PDFs sem camada de texto falharão.")
+        if self.ocr is True and not deps['tesseract']:
+            self._adicionar_log("ERRO: OCR habilitado mas Tesseract não encontrado.")
+            self._adicionar_log("Interrompendo processamento. Instale o Tesseract ou use 'ocr: false'.")
+            self._salvar_log()
+            return self._gerar_estatisticas()
+        
+        # Validação da especificação de páginas: um erro de config aborta o
+        # lote uma vez com mensagem clara, em vez de falhar arquivo a arquivo
+        try:
+            _parse_paginas(self.paginas)
+        except ValueError as e:
+            self._adicionar_log(f"ERRO na chave 'paginas' da configuração: {e}")
+            self._salvar_log()
+            return self._gerar_estatisticas()
+
+        # Validação de Tabelas
+        if self.detectar_tabelas and not deps['libgl']:
+            self._adicionar_log("ERRO: Detecção de tabelas habilitada mas libGL/OpenCV não encontrado.")
+            self._adicionar_log("Interrompendo processamento. Instale libGL ou use 'detectar_tabelas: false'.")
+            self._salvar_log()
+            return self._gerar_estatisticas()
+        
+        if not self.ignorar_dependencias and (not deps['libgl'] or not deps['tesseract']):
+            # Fallback legacy ou generic checks
+            pass
+        
+        self._adicionar_log("-" * 60)
+        
+        # Cria pasta de destino se não existir
+        self.pasta_destino.mkdir(parents=True, exist_ok=True)
+        
+        # Lista os arquivos PDF
+        arquivos = ListarArquivosPdf.listar(str(self.pasta_origem), self.subpastas)
+        
+        if not arquivos:
+            self._adicionar_log("Nenhum arquivo PDF encontrado!")
+            self._salvar_log()
+            return self._gerar_estatisticas()
+        
+        self._adicionar_log(f"Arquivos PDF encontrados: {len(arquivos)}")
+        self._adicionar_log("-" * 60)
+        
+        # Divide as CPUs entre os workers para as threads dos modelos:
+        # paralelismo entre arquivos e dentro de cada arquivo se equilibram
+        # sem superassinar os núcleos
+        if self.threads_por_arquivo:
+            threads_arquivo = self.threads_por_arquivo
+        else:
+            threads_arquivo = max(1, (os.cpu_count() or 4) // self.workers)
+
+        # Varre a pasta de destino uma única vez: o teste de "já processado"
+        # da montagem abaixo passa a ser consulta em set, sem stat por PDF
+        if not self.sobrescrever:
+            mds_existentes = _listar_mds_existentes(self.pasta_destino)
+        else:
+            mds_existentes = frozenset()
+
+        # Monta a lista de tarefas (cada PDF é independente dos demais)
+        tarefas = []
+        for arquivo_pdf in arquivos:
+            # Calcula o destino preservando estrutura de pastas
+            # (caminho relativo calculado uma única vez por arquivo)
+            caminho_relativo = self._caminho_relativo(arquivo_pdf)
+            pasta_destino_arquivo = self.pasta_destino / caminho_relativo
+
+            # Verifica se já existe arquivo de saída (agora .md) antes de
+            # qualquer mkdir — em reprocessamentos a maioria já existe
+            arquivo_md = pasta_destino_arquivo / f"{arquivo_pdf.stem}.md"
+
+            if not self.sobrescrever and str(arquivo_md) in mds_existentes:
+                self._adicionar_log(f"  -> IGNORADO: {arquivo_md.name} já existe")
+                self.stats['ignorados'] += 1
+                continue
+
+            # Cria a pasta de destino se necessário
+            pasta_destino_arquivo.mkdir(parents=True, exist_ok=True)
+
+            # Calcula pasta de log mantendo estrutura de subpastas se houver
+            if self.pasta_log != self.pasta_destino:
+                pasta_log_arquivo = self.pasta_log / caminho_relativo
+            else:
+                pasta_log_arquivo = pasta_destino_arquivo
+
+            tarefas.append((str(arquivo_pdf), str(pasta_destino_arquivo),
+                            str(pasta_log_arquivo), self.ignorar_dependencias,
+                            self.ocr, self.detectar_tabelas, self.paginas,
+                            self.pasta_cache, self.sobrescrever_cache,
+                            self.backend, self.device, self.paginas_por_chunk,
+                            threads_arquivo, self.gerar_imagens))
+
+        # Processa as tarefas em paralelo (um processo por PDF)
+        duracoes = []
+        if tarefas:
+            max_workers = min(self.workers, len(tarefas))
+            self._adicionar_log(f"Processando {len(tarefas)} arquivo(s) com {max_workers} worker(s)")
+            # Workers em 'spawn': cada processo importa docling/torch do zero,
+            # com o OMP_THREAD_LIMIT do initializer já em vigor (no fork, o
+            # runtime OpenMP herdado do pai ignoraria o limite) e sem os
+            # riscos de CUDA com processos forkados
+            with ProcessPoolExecutor(max_workers=max_workers,
+                                     mp_context=multiprocessing.get_context('spawn'),
+                                     initializer=_inicializar_worker,
+                                     initargs=(threads_arquivo,)) as executor:
+                futuros = [executor.submit(_processar_um, tarefa) for tarefa in tarefas]
+                for i, futuro in enumerate(as_completed(futuros), 1):
+                    resultado = futuro.result()
+                    nome_arquivo = Path(resultado['arquivo']).name
+                    ok = resultado['sucesso']
+                    self.stats.update({'processados': 1,
+                                       'sucesso': 1 if ok else 0,
+                                       'falha': 0 if ok else 1})
+                    duracoes.append(resultado.get('duracao', 0.0))
+                    if ok:
+                        self._adicionar_log(f"[{i}/{len(tarefas)}] SUCESSO: {nome_arquivo}")
+                    elif resultado['erro']:
+                        self._adicionar_log(f"[{i}/{len(tarefas)}] ERRO: {nome_arquivo}: {resultado['erro']}")
+                    else:
+                        self._adicionar_log(f"[{i}/{len(tarefas)}] FALHA: Verifique {Path(resultado['arquivo']).stem}.log")
+        
+        # Resumo final
+        self._adicionar_log("\n" + "=" * 60)
+        self._adicionar_log("RESUMO DO PROCESSAMENTO")
+        self._adicionar_log("=" * 60)
+        self._adicionar_log(f"Total de arquivos encontrados: {len(arquivos)}")
+        self._adicionar_log(f"Processados com sucesso: {self.stats['sucesso']}")
+        self._adicionar_log(f"Processados com falha: {self.stats['falha']}")
+        self._adicionar_log(f"Ignorados (já existem): {self.stats['ignorados']}")
+        # Agregado das durações por arquivo (os sidecars .timings.json trazem
+        # a quebra por etapa de cada um)
+        if duracoes:
+            self._adicionar_log(f"Tempo por arquivo: total {sum(duracoes):.1f}s, "
+                                f"média {sum(duracoes) / len(duracoes):.1f}s, "
+                                f"máximo {max(duracoes):.1f}s")
+        self._adicionar_log("=" * 60)
+        
+        self._salvar_log()
+        return self._gerar_estatisticas()
+    
+    def _gerar_estatisticas(self) -> dict:
+        """Gera dicionário com estatísticas do processamento."""
+        return {chave: self.stats[chave]
+                for chave in ('processados', 'sucesso', 'falha', 'ignorados')}
+
+
+def criar_yaml_modelo(caminho: str):
+    """Cria um arquivo YAML modelo no caminho especificado."""
+    conteudo = '''# Configuração para extração em lote de PDFs
+# Execute com: python extrair_pdf.py config_extracao.yaml
+
+# Pasta contendo os arquivos PDF (obrigatório)
+pasta_origem: ./pdfs
+
+# Pasta para salvar os arquivos extraídos (se vazio, usa pasta_origem)
+pasta_destino: ./textos
+
+# Pasta para salvar os logs (se vazio, usa pasta_destino)
+# pasta_log: ./logs
+
+# Processar subpastas recursivamente? (padrão: true)
+subpastas: true
+
+# Sobrescrever arquivos existentes? (padrão: false)
+sobrescrever: false
+
+# Habilitar OCR (Optical Character Recognition)?
+# Se true: requer Tesseract instalado. Se não tiver, o processamento para.
+# Se false (padrão): não usa OCR (muito mais rápido em PDFs com camada de texto)
+# Se auto: detecta a camada de texto e só usa OCR nos PDFs escaneados
+ocr: false
+
+# Habilitar detecção avançada de tabelas?
+# Se true (padrão): requer libGL/OpenCV instalado (=sudo apt install libgl1).
+# Se false: ignora tabelas se libGL não estiver disponível
+detectar_tabelas: true
+
+# Ignorar erros de dependências opcionais genéricas?
+# (padrão: true)
+ignorar_dependencias: true
+
+# Número de processos paralelos para extração (padrão: min(CPUs, 4))
+# workers: 4
+
+# Páginas a extrair de cada PDF, ex: "1-3,10,50-" (se vazio, todas)
+# paginas: "1-10"
+
+# Pasta de cache de extração por hash do PDF (se vazio, sem cache)
+# Reexecuções reutilizam o markdown já extraído sem rodar o Docling de novo
+# pasta_cache: ./cache
+
+# Ignorar o cache e reprocessar os PDFs? (padrão: false)
+# sobrescrever_cache: false
+
+# Backend de parsing do Docling: pypdfium2 (mais rápido), dlparse_v4 ou dlparse_v2
+# backend: pypdfium2
+
+# Dispositivo dos modelos do Docling: cuda, cpu ou auto (detecta GPU disponível)
+# device: auto
+
+# Divide PDFs grandes em fatias desse número de páginas e converte as fatias
+# em paralelo dentro do mesmo arquivo (0 ou vazio = desabilitado)
+# paginas_por_chunk: 50
+
+# Threads dos modelos do Docling em cada worker
+# (padrão: CPUs divididas pelo número de workers)
+# threads_por_arquivo: 2
+
+# Gerar as imagens das páginas no Docling? A extração só usa o marcador
+# <IMAGEM:nnn>, então o padrão false economiza memória e tempo por página
+# gerar_imagens: false
+'''
+    
+    with open(caminho, 'w', encoding='utf-8') as f:
+        f.write(conteudo)
+    
+    print(f"✅ Arquivo modelo criado: {caminho}")
+
+
+def mostrar_uso():
+    """Mostra instruções de uso do script."""
+    print("""
+╔══════════════════════════════════════════════════════════════════════════════╗
+║                   EXTRATOR DE PDF PARA MARKDOWN - DOCLING                    ║
+╠══════════════════════════════════════════════════════════════════════════════╣
+║ Uso:                                                                         ║
+║   python extrair_pdf.py <arquivo_pdf>                                        ║
+║   python extrair_pdf.py <arquivo_yaml>                                       ║
+║                                                                              ║
+║ Flags: --yes cria o YAML modelo sem perguntar (ou EXTRATOR_YES=1)            ║
+║        --no-prompt nunca abre o prompt interativo (sai com código 2)         ║
+║                                                                              ║
+║ Exemplos:                                                                    ║
+║   python extrair_pdf.py documento.pdf                                        ║
+║   python extrair_pdf.py config_extracao.yaml                                 ║
+║                                                                              ║
+║ Formato do arquivo YAML:                                                     ║
+║   pasta_origem: ./pdfs                                                       ║
+║   pasta_destino: ./textos                                                    ║
+║   pasta_log: ./logs                                                          ║
+║   subpastas: true                                                            ║
+║   sobrescrever: false                                                        ║
+║   ignorar_dependencias: true                                                 ║
+║                                                                              ║
+║ Parâmetros YAML:                                                             ║
+║   - pasta_origem: Pasta contendo os PDFs (obrigatório)                       ║
+║   - pasta_destino: Pasta para salvar os textos (padrão: pasta_origem)        ║
+║   - pasta_log: Pasta para salvar os logs (padrão: pasta_destino)             ║
+║   - subpastas: True/False - processar subpastas (padrão: True)               ║
+║   - sobrescrever: True/False - sobrescrever existentes (padrão: False)       ║
+║   - ocr: true|auto|false - OCR requer Tesseract (padrão: false)              ║
+║   - detectar_tabelas: True/False - detectar tabelas (padrão: True)           ║
+║   - ignorar_dependencias: True/False - ignorar deps opcionais (padrão: True) ║
+║   - workers: número de processos paralelos (padrão: min(CPUs, 4))           ║
+║   - paginas: páginas a extrair, ex: "1-3,10,50-" (padrão: todas)             ║
+║   - pasta_cache: pasta de cache por hash do PDF (padrão: sem cache)          ║
+║   - sobrescrever_cache: True/False - reprocessar o cache (padrão: False)     ║
+║   - backend: pypdfium2|dlparse_v4|dlparse_v2 (padrão: pypdfium2)             ║
+║   - device: cuda|cpu|auto - dispositivo dos modelos (padrão: auto)           ║
+║   - paginas_por_chunk: fatia PDFs grandes p/ converter em paralelo (padrão 0)║
+║   - threads_por_arquivo: threads dos modelos por worker (padrão CPUs/workers)║
+║   - gerar_imagens: True/False - gerar imagens das páginas (padrão: False)    ║
+║                                                                              ║
+║ Saída:                                                                       ║
+║   - Arquivo .md com o texto em Markdown (tags <PAGINA:nnn> e <IMAGEM:nnn>)   ║
+║   - Arquivo .log com detalhes da extração de cada arquivo                    ║
+║   - Arquivo .timings.json com os tempos por etapa do Docling                 ║
+║   - log_extração.txt com resumo geral (modo pasta)                           ║
+╚══════════════════════════════════════════════════════════════════════════════╝
+""")
+
+
+def _exigir_docling():
+    """Aborta com mensagem amigável se o docling não estiver instalado."""
+    if not _docling_disponivel():
+        print("❌ ERRO: O pacote 'docling' não está instalado.")
+        print("   Instale com: pip install docling")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    argumentos = sys.argv[1:]
+
+    # Flags de automação: --yes cria o YAML modelo sem perguntar (equivale a
+    # EXTRATOR_YES=1) e --no-prompt falha rápido em vez de abrir o prompt.
+    # Sem TTY (cron/CI), o script nunca bloqueia em input()
+    criar_sem_perguntar = ('--yes' in argumentos
+                           or os.environ.get('EXTRATOR_YES') == '1')
+    sem_prompt = '--no-prompt' in argumentos
+    argumentos = [a for a in argumentos if a not in ('--yes', '--no-prompt')]
+
+    if not argumentos:
+        mostrar_uso()
+        sys.exit(1)
+
+    arquivo_enviado = argumentos[0]
+
+    # Um único stat e um único lower() decidem o despacho (os branches abaixo
+    # reutilizam eh_arquivo/extensao em vez de repetir os.path.isfile)
+    import stat as _stat
+    try:
+        eh_arquivo = _stat.S_ISREG(os.stat(arquivo_enviado).st_mode)
+    except OSError:
+        eh_arquivo = False
+    extensao = os.path.splitext(arquivo_enviado)[1].lower()
+
+    # Processa arquivo PDF individual
+    if eh_arquivo and extensao == '.pdf':
+        _exigir_docling()
+        print(f"\n🔄 Processando PDF: {arquivo_enviado}\n")
+        extrator = ExtrairPdf(arquivo_enviado)
+        sucesso = extrator.extrair()
+        
+        if sucesso:
+            print(f"\n✅ Markdown extraído com sucesso!")
+            print(f"   Arquivo: {extrator.arquivo_md}")
+        else:
+            print(f"\n❌ Falha na extração. Verifique o log: {extrator.arquivo_log}")
+            sys.exit(1)
+    
+    # Processa arquivo YAML com configurações
+    elif extensao in ('.yaml', '.yml'):
+        # Verifica se o arquivo existe
+        if not eh_arquivo:
+            print(f"\n⚠️  Arquivo YAML não encontrado: {arquivo_enviado}")
+            if criar_sem_perguntar:
+                resposta = 's'
+            elif sem_prompt or not sys.stdin.isatty():
+                # Execução automatizada: não bloqueia aguardando resposta
+                print("   Use --yes (ou EXTRATOR_YES=1) para criar um arquivo modelo sem perguntar.")
+                sys.exit(2)
+            else:
+                resposta = input("   Deseja criar um arquivo modelo? (s/n): ").strip().lower()
+
+            if resposta in ['s', 'sim', 'y', 'yes']:
+                criar_yaml_modelo(arquivo_enviado)
+                print(f"\n📝 Edite o arquivo '{arquivo_enviado}' e execute novamente.")
+            else:
+                print("   Operação cancelada.")
+            sys.exit(0)
+        
+        _exigir_docling()
+        print(f"\n🔄 Processando pasta com configuração: {arquivo_enviado}\n")
+        processador = ProcessarPasta(arquivo_enviado)
+        estatisticas = processador.processar()
+        
+        print(f"\n📊 Resultado:")
+        print(f"   Sucesso: {estatisticas['sucesso']}")
+        print(f"   Falhas: {estatisticas['falha']}")
+        print(f"   Ignorados: {estatisticas['ignorados']}")
+        
+        if estatisticas['falha'] > 0:
+            sys.exit(1)
+    
+    else:
+        print(f"\n❌ Arquivo não encontrado ou formato inválido: {arquivo_enviado}")
+        print("   Use arquivos .pdf ou .yaml")
+        mostrar_uso()
         sys.exit(1)
\ No newline at end of file